@@ -2,37 +2,27 @@
 import os
 from dotenv import load_dotenv
 
+# Must run before config.Config reads the environment
 env_path = os.path.join(os.path.dirname(__file__), '.env')
 load_dotenv(env_path)
 
-# DEBUG — prints as early as possible
-print("\n===== DEBUG INFO (from app.py) =====")
-print("Python executable:", os.sys.executable)
-print("Working directory:", os.getcwd())
-print("app.py __file__:", __file__)
-print(".env absolute path:", env_path)
-print(".env exists (os.path.exists):", os.path.exists(env_path))
-print(".env readable (try open):", end=" ")
-try:
-    with open(env_path, 'r', encoding='utf-8') as f:
-        first_line = f.readline().strip()
-    print("yes; first line starts with:", first_line[:80])
-except Exception as e:
-    print("no (error):", e)
-print("MONGODB_URI from os.environ:", os.getenv("MONGODB_URI"))
-print("MONGODB_URI from dotenv.find_dotenv():", end=" ")
-try:
-    import dotenv
-    print(dotenv.find_dotenv())
-except Exception as e:
-    print("python-dotenv not installed or import error:", e)
-print("====================================\n")
-
-# Now import the rest of your app
-from flask import Flask, jsonify
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from config import Config
-from lib.mongodb import init_db
+from lib.mongodb import init_db, ping, pool_metrics
+from lib.metrics import init_metrics, render_metrics
+from lib.compression import init_compression
+from lib.page_cache import page_cache
+from lib.auth import user_cache, token_cache
+from lib.password_pool import PASSWORD_HASH_METHOD, method_prefix, password_pool
+from lib.rate_limit import login_limiter
+from lib.json_provider import MongoJSONProvider
+from lib.indexes import IndexBuildError, ensure_indexes, indexes_cli
+from lib.catalogue import seed_services
+from lib.rollups import rollups_cli
+from lib.accounts import accounts_cli
+from lib.availability import availability_cli, backfill_schedules
+from lib.assets import assets_cli, init_assets
 
 # Import blueprints (order matters for URL prefix conflicts)
 from routes.frontend import frontend_bp  # No prefix - must be first
@@ -41,16 +31,43 @@ from routes.services import services_bp
 from routes.bookings import bookings_bp
 from routes.admin import admin_bp
 from routes.requests import requests_bp
+from routes.feed import feed_bp
+
+# Seconds /health waits for MongoDB before reporting unhealthy
+HEALTH_PING_TIMEOUT = float(os.getenv('HEALTH_PING_TIMEOUT', '1'))
+# If set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+def bootstrap_db():
+    """Create indexes and seed reference data; idempotent, run once per deploy
+    or startup (the gunicorn master does it before forking workers)"""
+    ensure_indexes()
+    seed_services()
+    added = backfill_schedules()
+    if added:
+        print(f"✅ Added {added} booking(s) missing from provider schedules")
 
-def create_app(config_class=Config):
+def create_app(config_class=Config, bootstrap=True):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = MongoJSONProvider(app)
     CORS(app, origins="*", supports_credentials=True)
+    init_metrics(app)
+    init_compression(app)
+    init_assets(app)
+    # One KDF run, here in the gunicorn master, rather than on the first
+    # login of every worker: forked workers inherit the cached prefix
+    method_prefix(PASSWORD_HASH_METHOD)
     
-    # Initialize database first
+    # Initialize database first (the client connects lazily on first use)
     try:
         init_db(app)
+        if bootstrap:
+            bootstrap_db()
         print("✅ Database initialized successfully")
+    except IndexBuildError:
+        # Without the unique users indexes signup would accept duplicates
+        raise
     except Exception as e:
         print(f"❌ Database initialization failed: {e}")
         # Don't raise here - let app start but with limited functionality
@@ -62,15 +79,51 @@ def create_app(config_class=Config):
     app.register_blueprint(bookings_bp, url_prefix='/api')
     app.register_blueprint(requests_bp, url_prefix='/api/requests')
     app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(feed_bp, url_prefix='/api/feed')
+
+    # flask --app app:create_app indexes apply|check
+    app.cli.add_command(indexes_cli)
+    # flask --app app:create_app rollups rebuild [--check]
+    app.cli.add_command(rollups_cli)
+    app.cli.add_command(accounts_cli)
+    # flask --app app:create_app availability rebuild|backfill|prune
+    app.cli.add_command(availability_cli)
+    # flask --app app:create_app assets build
+    app.cli.add_command(assets_cli)
     
     @app.route('/health')
     def health_check():
-        """Health check endpoint for monitoring"""
+        """Health check endpoint for monitoring; pings MongoDB through the pool"""
+        try:
+            latency = ping(HEALTH_PING_TIMEOUT)
+        except Exception as e:
+            return jsonify({
+                'status': 'unhealthy',
+                'message': 'AyudaBesh API cannot reach MongoDB',
+                'database': 'disconnected',
+                'error': str(e)
+            }), 503
         return jsonify({
-            'status': 'ok', 
+            'status': 'ok',
             'message': 'AyudaBesh API is running',
-            'database': 'connected' if os.getenv("MONGODB_URI") else 'disconnected'
+            'database': 'connected',
+            'ping_ms': round(latency * 1000, 2)
         }), 200
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus metrics for this worker process"""
+        if METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+            return jsonify({'error': 'Unauthorized'}), 401
+        body = render_metrics({
+            'mongodb_pool': pool_metrics.snapshot(),
+            'password_pool': password_pool.stats(),
+            'login_limiter': login_limiter.stats(),
+            'user_cache': user_cache.stats(),
+            'token_cache': token_cache.stats(),
+            'page_cache': page_cache.stats()
+        })
+        return Response(body, mimetype='text/plain; version=0.0.4')
         
     @app.errorhandler(404)
     def not_found(error):
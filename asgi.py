@@ -0,0 +1,79 @@
+# asgi.py
+"""Async deployment mode: uvicorn asgi:app (or hypercorn asgi:app)
+
+The I/O-bound read endpoints and the job feed stream in
+routes/async_api.py run natively on the event loop with Motor, so
+concurrent DB-bound requests and open streams share one loop instead of
+holding a thread each. Every other route of the auth, services, bookings,
+requests and admin blueprints (writes, logins, pages) goes to the regular
+Flask app, run on a pool of ASGI_WSGI_THREADS threads.
+"""
+
+import asyncio
+import os
+from a2wsgi import WSGIMiddleware
+from quart import Quart
+from werkzeug.exceptions import HTTPException
+from app import bootstrap_db, create_app
+from config import Config
+from lib.indexes import IndexBuildError
+from lib.json_provider import MongoJSONProvider
+from lib.metrics import observe_asgi
+from lib.motor_db import close_motor, init_motor
+from routes.async_api import async_api_bp
+
+# Threads per process for the Flask routes, like GUNICORN_THREADS for gthread
+ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '16'))
+
+def create_async_app(config_class=Config):
+    async_app = Quart(__name__, static_folder=None)
+    async_app.config.from_object(config_class)
+    async_app.json = MongoJSONProvider(async_app)
+    async_app.register_blueprint(async_api_bp)
+
+    @async_app.before_serving
+    async def startup():
+        init_motor(async_app)
+        try:
+            await asyncio.to_thread(bootstrap_db)
+        except IndexBuildError:
+            # Fails lifespan startup, so the server exits
+            raise
+        except Exception as e:
+            print(f"❌ Database bootstrap failed: {e}")
+
+    @async_app.after_serving
+    async def shutdown():
+        close_motor()
+
+    return async_app
+
+class Dispatcher:
+    """Send requests that match an async route to Quart, everything else to Flask"""
+
+    def __init__(self, async_app, wsgi_app):
+        self.async_app = async_app
+        # A real thread pool: asgiref's WsgiToAsgi runs every WSGI call on one shared thread
+        self.wsgi_app = WSGIMiddleware(wsgi_app, workers=ASGI_WSGI_THREADS)
+        self.async_urls = async_app.url_map.bind('localhost')
+
+    def _async_endpoint(self, scope):
+        """Endpoint of the async route matching the request, else None"""
+        try:
+            endpoint, _ = self.async_urls.match(scope['path'], method=scope['method'])
+            return endpoint
+        except HTTPException:
+            return None
+
+    async def __call__(self, scope, receive, send):
+        # Lifespan events drive Quart's before/after_serving hooks
+        if scope['type'] == 'lifespan':
+            return await self.async_app(scope, receive, send)
+        endpoint = self._async_endpoint(scope) if scope['type'] == 'http' else None
+        if endpoint is not None:
+            # Flask requests are timed by the WSGI metrics middleware
+            return await observe_asgi(self.async_app, scope, receive, send,
+                                      endpoint.split('.', 1)[0], endpoint)
+        return await self.wsgi_app(scope, receive, send)
+
+app = Dispatcher(create_async_app(), create_app(bootstrap=False))
@@ -0,0 +1,110 @@
+# benchmarks/async_vs_sync.py
+"""Side-by-side load test of the sync (gunicorn wsgi:app) and async
+(uvicorn asgi:app) deployments at 1k concurrent connections.
+
+Both servers use the configured MONGODB_URI, so point it at a disposable
+database that already holds test data.
+
+    python -m benchmarks.async_vs_sync --path /api/requests/pending --connections 1000
+"""
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+HOST = '127.0.0.1'
+PORT = 5056
+
+
+def server_command(mode, workers, threads):
+    bind = f'{HOST}:{PORT}'
+    if mode == 'sync':
+        return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', bind,
+                '--workers', str(workers), '--threads', str(threads),
+                '--access-logfile', '/dev/null', 'wsgi:app']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', HOST, '--port', str(PORT),
+            '--workers', str(workers), '--no-access-log', '--log-level', 'warning']
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not come up at {url}")
+
+
+async def fetch(path, headers):
+    """One GET over a fresh connection; returns the HTTP status"""
+    reader, writer = await asyncio.open_connection(HOST, PORT)
+    extra = ''.join(f'{k}: {v}\r\n' for k, v in headers.items())
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\nConnection: close\r\n{extra}\r\n'.encode())
+    await writer.drain()
+    status_line = await reader.readline()
+    while await reader.read(65536):
+        pass
+    writer.close()
+    return int(status_line.split()[1])
+
+
+async def load(path, headers, connections, duration):
+    latencies, errors = [], 0
+    stop = time.monotonic() + duration
+
+    async def client():
+        nonlocal errors
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            try:
+                status = await asyncio.wait_for(fetch(path, headers), timeout=30)
+                if status < 400:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+            except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+                errors += 1
+
+    await asyncio.gather(*(client() for _ in range(connections)))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--path', default='/api/requests/pending?format=ndjson')
+    parser.add_argument('--token', help='Bearer token for authenticated paths')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker')
+    args = parser.parse_args()
+    headers = {'Authorization': f'Bearer {args.token}'} if args.token else {}
+
+    print(f"{args.connections} connections, {args.workers} workers, {args.duration:.0f}s on {args.path}")
+    print(f"{'mode':<6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>8}")
+    for mode in ('sync', 'async'):
+        server = subprocess.Popen(server_command(mode, args.workers, args.threads),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_up(f'http://{HOST}:{PORT}/health')
+            latencies, errors = asyncio.run(load(args.path, headers, args.connections, args.duration))
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+        if len(latencies) < 2:
+            print(f"{mode:<6} {'-':>8} {'-':>8} {'-':>8} {'-':>8} {errors:>8}")
+            continue
+        q = statistics.quantiles(latencies, n=100)
+        print(f"{mode:<6} {len(latencies) / args.duration:>8.0f} {q[49] * 1000:>8.1f} "
+              f"{q[94] * 1000:>8.1f} {q[98] * 1000:>8.1f} {errors:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/common.py
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run against a scratch database on a local mongod (never the
+MONGODB_URI used by the app) and are started from the repository root, e.g.
+
+    python -m benchmarks.daily_bookings
+"""
+
+import os
+import threading
+import time
+from pymongo import MongoClient, monitoring
+from flask import Flask, request
+import lib.mongodb
+from lib.json_provider import MongoJSONProvider
+
+BENCH_URI = os.getenv('BENCH_MONGODB_URI', 'mongodb://localhost:27017')
+BENCH_DB_NAME = os.getenv('BENCH_MONGODB_DB', 'ayudabesh_bench')
+# Repository root, so apps built here find templates/ and static/
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts MongoDB commands (round trips) issued by the client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.by_command = {}
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+            self.by_command = {}
+
+    def started(self, event):
+        # Concurrent benchmarks issue commands from many threads
+        with self._lock:
+            self.count += 1
+            self.by_command[event.command_name] = self.by_command.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def connect_bench_db():
+    """Connect to the scratch database and install it as the app database.
+
+    Returns (db, counter); the database is dropped first so every run starts
+    from a clean slate.
+    """
+    counter = CommandCounter()
+    client = MongoClient(BENCH_URI, event_listeners=[counter])
+    client.drop_database(BENCH_DB_NAME)
+    db = client[BENCH_DB_NAME]
+    lib.mongodb.db = db
+    counter.reset()
+    return db, counter
+
+
+def make_app(*blueprints):
+    """Minimal Flask app with the given (blueprint, url_prefix) pairs registered"""
+    app = Flask(__name__, root_path=ROOT_DIR)
+    app.json = MongoJSONProvider(app)
+    for blueprint, url_prefix in blueprints:
+        app.register_blueprint(blueprint, url_prefix=url_prefix)
+    return app
+
+
+def call_view(app, view, path='/', current_user=None, **kwargs):
+    """Invoke a view function directly inside a request context.
+
+    Skips JWT handling so the benchmark measures only the handler's own work.
+    """
+    with app.test_request_context(path, **kwargs):
+        if current_user is not None:
+            request.current_user = current_user
+        rv = view()
+        # Views return (response, status) tuples
+        return rv[0] if isinstance(rv, tuple) else rv
+
+
+def timed(fn, *args, **kwargs):
+    """Run fn and return (result, elapsed_seconds)"""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """{p: value} nearest-rank percentiles of a list of samples (empty -> zeros)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return {p: 0.0 for p in points}
+    return {p: ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in points}
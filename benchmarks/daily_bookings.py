@@ -0,0 +1,50 @@
+# benchmarks/daily_bookings.py
+"""Round trips and latency of /api/admin/reports/daily-bookings as the
+number of bookings made today grows.
+
+    python -m benchmarks.daily_bookings
+"""
+
+import random
+from datetime import datetime
+from benchmarks.common import connect_bench_db, make_app, call_view, timed
+from routes.admin import admin_bp, daily_bookings_report
+
+SIZES = (10, 100, 1000, 10000)
+ADMIN = {'user_id': '000000000000000000000000', 'role': 'admin'}
+
+
+def seed(db, n_bookings, n_users=200):
+    users = [{'fullName': f'User {i}', 'role': 'provider' if i % 2 else 'customer'}
+             for i in range(n_users)]
+    user_ids = db.users.insert_many(users).inserted_ids
+    now = datetime.utcnow()
+    db.bookings.insert_many([
+        {
+            'customer_id': random.choice(user_ids),
+            'provider_id': random.choice(user_ids),
+            'service_type': 'Plumbing',
+            'status': 'pending',
+            'price': 500,
+            'created_at': now
+        }
+        for _ in range(n_bookings)
+    ])
+
+
+def main():
+    app = make_app((admin_bp, '/api/admin'))
+    print(f"{'bookings':>10} {'round trips':>12} {'ms':>10}")
+    for size in SIZES:
+        db, counter = connect_bench_db()
+        seed(db, size)
+        counter.reset()
+        # Past token_required: call_view already sets request.current_user
+        response, elapsed = timed(call_view, app, daily_bookings_report.__wrapped__,
+                                  '/api/admin/reports/daily-bookings', current_user=ADMIN)
+        assert len(response.get_json()) == size
+        print(f"{size:>10} {counter.count:>12} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
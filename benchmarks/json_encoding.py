@@ -0,0 +1,83 @@
+# benchmarks/json_encoding.py
+"""Serialization throughput of booking documents: the old per-route
+ObjectId/datetime loop + Flask's default jsonify, versus MongoJSONProvider
+with the standard json backend and with orjson (if installed).
+
+Needs no database.
+
+    python -m benchmarks.json_encoding
+"""
+
+import copy
+import time
+from datetime import datetime, timedelta
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from flask import Flask, jsonify
+from lib.json_provider import MongoJSONProvider, orjson
+
+DOCS = 10000
+ROUNDS = 5
+
+
+def make_docs(n):
+    now = datetime.utcnow()
+    return [{
+        '_id': ObjectId(),
+        'customer_id': ObjectId(),
+        'provider_id': ObjectId(),
+        'service_type': 'plumbing',
+        'booking_time': now + timedelta(days=1),
+        'status': 'pending',
+        'price': Decimal128('750.00'),
+        'created_at': now - timedelta(minutes=i)
+    } for i in range(n)]
+
+
+def legacy(app, docs):
+    with app.test_request_context():
+        for booking in docs:
+            booking['_id'] = str(booking['_id'])
+            booking['customer_id'] = str(booking['customer_id'])
+            booking['provider_id'] = str(booking['provider_id'])
+            booking['price'] = str(booking['price'])
+        return jsonify(docs).get_data()
+
+
+def provider(app, docs):
+    with app.test_request_context():
+        return jsonify(docs).get_data()
+
+
+def bench(label, fn, app, source):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        docs = copy.deepcopy(source)
+        start = time.perf_counter()
+        fn(app, docs)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<28} {len(source) / best:>12,.0f} docs/s")
+
+
+def main():
+    source = make_docs(DOCS)
+
+    default_app = Flask(__name__)
+    bench('per-route loop + jsonify', legacy, default_app, source)
+
+    std_app = Flask(__name__)
+    std_app.json = MongoJSONProvider(std_app)
+    std_app.json.use_orjson = False
+    bench('MongoJSONProvider (json)', provider, std_app, source)
+
+    if orjson is not None:
+        fast_app = Flask(__name__)
+        fast_app.json = MongoJSONProvider(fast_app)
+        fast_app.json.use_orjson = True
+        bench('MongoJSONProvider (orjson)', provider, fast_app, source)
+    else:
+        print('orjson not installed; skipping the fast backend')
+
+
+if __name__ == '__main__':
+    main()
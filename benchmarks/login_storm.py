@@ -0,0 +1,132 @@
+# benchmarks/login_storm.py
+"""Login throughput, and latency of other endpoints during a login storm.
+
+For each PASSWORD_POOL_WORKERS value, starts gunicorn, hammers
+/api/auth/login from many clients and meanwhile times GET /api/services
+from one probe client. Workers=0 hashes inline on the request threads (the
+old behaviour). A bench user is upserted into the configured MONGODB_URI
+database, so point it at a disposable one.
+
+    python -m benchmarks.login_storm --pool-workers 0 2 4 --storm 32
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from werkzeug.security import generate_password_hash
+from benchmarks.common import percentiles
+from benchmarks.wsgi_scaling import HOST, PORT, wait_until_up
+
+BENCH_USER = {'username': 'bench_login', 'password': 'bench-password', 'role': 'customer'}
+
+
+def seed_user():
+    load_dotenv()
+    from lib.password_pool import PASSWORD_HASH_METHOD
+    client = MongoClient(os.environ['MONGODB_URI'])
+    db = client[os.getenv('MONGODB_DB_NAME', 'ayudabesh')]
+    db.users.update_one(
+        {'username': BENCH_USER['username']},
+        {'$set': {
+            'email': 'bench_login@example.com',
+            'password': generate_password_hash(BENCH_USER['password'], method=PASSWORD_HASH_METHOD),
+            'fullName': 'Bench Login',
+            'role': BENCH_USER['role']
+        }},
+        upsert=True
+    )
+    client.close()
+
+
+def login_storm(base, clients, stop):
+    """POST /api/auth/login from `clients` threads until stop; return {status: count}"""
+    body = json.dumps(BENCH_USER).encode('utf-8')
+    statuses = {}
+    lock = threading.Lock()
+
+    def client():
+        seen = {}
+        while time.monotonic() < stop:
+            req = urllib.request.Request(f"{base}/api/auth/login", data=body,
+                                         headers={'Content-Type': 'application/json'})
+            try:
+                status = urllib.request.urlopen(req, timeout=30).status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            except Exception:
+                status = 'error'
+            seen[status] = seen.get(status, 0) + 1
+        with lock:
+            for status, count in seen.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    with ThreadPoolExecutor(clients) as pool:
+        for _ in range(clients):
+            pool.submit(client)
+    return statuses
+
+
+def probe(url, stop):
+    """Time sequential GETs of url until stop; return latencies in seconds"""
+    latencies = []
+    while time.monotonic() < stop:
+        start = time.perf_counter()
+        try:
+            urllib.request.urlopen(url, timeout=30).read()
+        except Exception:
+            pass
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pool-workers', type=int, nargs='+', default=[0, 2])
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--storm', type=int, default=32, help='concurrent login clients')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--probe-path', default='/api/services')
+    args = parser.parse_args()
+
+    seed_user()
+    base = f"http://{HOST}:{PORT}"
+    print(f"{'kdf pool':>8} {'logins/s':>9} {'503s':>6} {'other':>6} "
+          f"{'probe p50':>10} {'p95':>8} {'p99':>8}  (ms)")
+    for pool_workers in args.pool_workers:
+        env = dict(os.environ, PASSWORD_POOL_WORKERS=str(pool_workers))
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--bind', f'{HOST}:{PORT}', '--workers', str(args.workers),
+             '--threads', str(args.threads), '--access-logfile', '/dev/null', 'wsgi:app'],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_up(base + args.probe_path)
+            stop = time.monotonic() + args.duration
+            with ThreadPoolExecutor(1) as prober:
+                latencies = prober.submit(probe, base + args.probe_path, stop)
+                statuses = login_storm(base, args.storm, stop)
+                latencies = latencies.result()
+            ok = statuses.get(200, 0)
+            shed = statuses.get(503, 0)
+            other = sum(statuses.values()) - ok - shed
+            p = percentiles(latencies)
+            print(f"{pool_workers:>8} {ok / args.duration:>9.1f} {shed:>6} {other:>6} "
+                  f"{p[50] * 1000:>10.1f} {p[95] * 1000:>8.1f} {p[99] * 1000:>8.1f}")
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+# benchmarks/provider_search.py
+"""Load test of GET /api/providers at 50k seeded providers: p50/p95 latency
+for each search mode with concurrent clients.
+
+    python -m benchmarks.provider_search [N_PROVIDERS]
+"""
+
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import connect_bench_db, make_app
+from lib.indexes import ensure_indexes
+from routes.services import services_bp
+
+DEFAULT_PROVIDERS = 50000
+REQUESTS_PER_SCENARIO = 500
+CONCURRENCY = 16
+SERVICES = ['cleaning', 'plumbing', 'electrical', 'pest_control', 'appliance', 'maintenance']
+CITIES = ['Cebu City', 'Mandaue', 'Lapu-Lapu', 'Talisay', 'Consolacion']
+# Metro Cebu bounding box
+LAT_RANGE = (10.20, 10.45)
+LNG_RANGE = (123.80, 124.05)
+
+SCENARIOS = {
+    'service + rating': lambda: f"/api/providers?service={random.choice(SERVICES)}",
+    'service + rate range': lambda: (f"/api/providers?service={random.choice(SERVICES)}"
+                                     f"&min_rate=300&max_rate=700&sort=rate"),
+    'min_rating': lambda: "/api/providers?min_rating=4&sort=rating",
+    'geo 5km by distance': lambda: (f"/api/providers?lat={random.uniform(*LAT_RANGE):.5f}"
+                                    f"&lng={random.uniform(*LNG_RANGE):.5f}&radius_km=5"),
+    'geo 10km + service by rate': lambda: (f"/api/providers?lat={random.uniform(*LAT_RANGE):.5f}"
+                                           f"&lng={random.uniform(*LNG_RANGE):.5f}&radius_km=10"
+                                           f"&service={random.choice(SERVICES)}&sort=rate"),
+}
+
+
+def seed(db, n):
+    batch = []
+    for i in range(n):
+        batch.append({
+            'username': f'provider{i}',
+            'email': f'provider{i}@example.com',
+            'fullName': f'Provider {i}',
+            'role': 'provider',
+            'is_verified': random.random() < 0.8,
+            'services_offered': random.sample(SERVICES, random.randint(1, 3)),
+            'hourly_rate': random.randrange(200, 1500, 50),
+            'rating_avg': round(random.uniform(1, 5), 2),
+            'location': random.choice(CITIES),
+            'geo': {'type': 'Point',
+                    'coordinates': [random.uniform(*LNG_RANGE), random.uniform(*LAT_RANGE)]}
+        })
+        if len(batch) == 5000:
+            db.users.insert_many(batch)
+            batch = []
+    if batch:
+        db.users.insert_many(batch)
+
+
+def run_scenario(app, make_path):
+    def one(_):
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.get(make_path())
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return elapsed
+
+    with ThreadPoolExecutor(CONCURRENCY) as pool:
+        start = time.perf_counter()
+        latencies = sorted(pool.map(one, range(REQUESTS_PER_SCENARIO)))
+        wall = time.perf_counter() - start
+    quantiles = statistics.quantiles(latencies, n=100)
+    return quantiles[49], quantiles[94], REQUESTS_PER_SCENARIO / wall
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PROVIDERS
+    db, _ = connect_bench_db()
+    seed(db, n)
+    ensure_indexes(db)
+    app = make_app((services_bp, '/api'))
+
+    print(f"{n} providers, {CONCURRENCY} concurrent clients, {REQUESTS_PER_SCENARIO} requests each")
+    print(f"{'scenario':<28} {'p50 ms':>8} {'p95 ms':>8} {'req/s':>8}")
+    for name, make_path in SCENARIOS.items():
+        p50, p95, rps = run_scenario(app, make_path)
+        print(f"{name:<28} {p50 * 1000:>8.1f} {p95 * 1000:>8.1f} {rps:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# benchmarks/seed.py
+"""Synthetic data for the benchmarks: customers, providers, an admin,
+bookings, service requests and disputes, generated from a fixed random
+seed so every run sees the same data.
+
+    python -m benchmarks.seed --scale 1
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from werkzeug.security import generate_password_hash
+from benchmarks.common import connect_bench_db
+from lib.availability import rebuild_schedules
+from lib.catalogue import seed_services
+from lib.indexes import ensure_indexes
+from lib.password_pool import PASSWORD_HASH_METHOD
+from lib.rollups import rebuild_rollups
+
+# Every seeded user logs in with this password
+BENCH_PASSWORD = 'bench-password'
+
+# Row counts at --scale 1
+BASE_COUNTS = {
+    'customers': 5000,
+    'providers': 1000,
+    'bookings': 50000,
+    'service_requests': 20000,
+    'disputes': 500,
+}
+
+SERVICES = ['cleaning', 'plumbing', 'electrical', 'pest_control', 'appliance', 'maintenance']
+CITIES = ['Cebu City', 'Mandaue', 'Lapu-Lapu', 'Talisay', 'Consolacion']
+LAT_RANGE = (10.20, 10.45)
+LNG_RANGE = (123.80, 124.05)
+BOOKING_STATUSES = (['pending'] * 3 + ['accepted'] * 2 + ['completed'] * 5)
+DURATIONS = (60, 60, 90, 120, 180)
+REQUEST_STATUSES = (['pending'] * 5 + ['accepted'] * 3 + ['completed'] * 2)
+HISTORY_DAYS = 90
+BATCH_SIZE = 5000
+
+
+def scaled_counts(scale: float) -> dict:
+    return {name: max(1, int(count * scale)) for name, count in BASE_COUNTS.items()}
+
+
+def _insert(collection, docs):
+    for start in range(0, len(docs), BATCH_SIZE):
+        collection.insert_many(docs[start:start + BATCH_SIZE], ordered=False)
+
+
+def generate(db, counts: dict, seed: int = 42) -> dict:
+    """Fill db with synthetic data; returns what the benchmark runner needs:
+    {"admin": id, "customers": [ids], "providers": [ids],
+     "usernames": {"customer": [...], "provider": [...]}}"""
+    rng = random.Random(seed)
+
+    def new_id():
+        # Drawn from rng too, so ids (and therefore cursors) repeat across runs
+        return ObjectId(rng.getrandbits(96).to_bytes(12, 'big'))
+    now = datetime.utcnow().replace(microsecond=0)
+    # One KDF run for everyone; hashing each user would dominate seeding time
+    password = generate_password_hash(BENCH_PASSWORD, method=PASSWORD_HASH_METHOD)
+
+    def when(days=HISTORY_DAYS):
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    admin = {'_id': new_id(), 'username': 'bench_admin', 'email': 'bench_admin@example.com',
+             'password': password, 'fullName': 'Bench Admin', 'role': 'admin', 'createdAt': now}
+    customers = [{
+        '_id': new_id(), 'username': f'customer{i}', 'email': f'customer{i}@example.com',
+        'password': password, 'fullName': f'Customer {i}', 'role': 'customer', 'createdAt': when()
+    } for i in range(counts['customers'])]
+    providers = [{
+        '_id': new_id(), 'username': f'provider{i}', 'email': f'provider{i}@example.com',
+        'password': password, 'fullName': f'Provider {i}', 'role': 'provider', 'createdAt': when(),
+        'is_verified': rng.random() < 0.8,
+        'services_offered': rng.sample(SERVICES, rng.randint(1, 3)),
+        'hourly_rate': rng.randrange(200, 1500, 50),
+        'location': rng.choice(CITIES),
+        'description': '',
+        'geo': {'type': 'Point', 'coordinates': [rng.uniform(*LNG_RANGE), rng.uniform(*LAT_RANGE)]}
+    } for i in range(counts['providers'])]
+    _insert(db.users, [admin] + customers + providers)
+
+    bookings = []
+    for _ in range(counts['bookings']):
+        customer, provider = rng.choice(customers), rng.choice(providers)
+        created_at = when()
+        status = rng.choice(BOOKING_STATUSES)
+        booking_time = created_at + timedelta(days=rng.randint(1, 14), hours=rng.randint(8, 17))
+        duration = rng.choice(DURATIONS)
+        booking = {
+            '_id': new_id(), 'customer_id': customer['_id'], 'provider_id': provider['_id'],
+            'service_type': rng.choice(provider['services_offered']),
+            'booking_time': booking_time, 'duration_minutes': duration,
+            'end_time': booking_time + timedelta(minutes=duration),
+            'status': status, 'price': rng.randrange(300, 3000, 50),
+            'created_at': created_at, 'updated_at': created_at
+        }
+        if status in ('accepted', 'completed'):
+            booking['accepted_at'] = booking['updated_at'] = created_at + timedelta(minutes=rng.randint(1, 600))
+        if status == 'completed':
+            booking['completed_at'] = booking['updated_at'] = booking['accepted_at'] + timedelta(hours=rng.randint(2, 72))
+            if rng.random() < 0.7:
+                booking['rating'] = rng.randint(1, 5)
+        bookings.append(booking)
+    _insert(db.bookings, bookings)
+
+    requests = []
+    for _ in range(counts['service_requests']):
+        customer = rng.choice(customers)
+        created_at = when()
+        requests.append({
+            'customerId': str(customer['_id']), 'customerName': customer['fullName'],
+            'serviceId': rng.choice(SERVICES), 'serviceName': 'Service',
+            'status': rng.choice(REQUEST_STATUSES),
+            'createdAt': created_at,
+            'updatedAt': created_at + timedelta(minutes=rng.randint(0, 1440))
+        })
+    _insert(db.service_requests, requests)
+
+    disputes = []
+    for booking in rng.sample(bookings, min(counts['disputes'], len(bookings))):
+        disputes.append({
+            'booking_id': booking['_id'], 'customer_id': booking['customer_id'],
+            'provider_id': booking['provider_id'], 'description': 'Service not as described',
+            'status': 'open', 'created_at': booking['created_at'] + timedelta(days=1)
+        })
+    _insert(db.disputes, disputes)
+
+    ensure_indexes(db)
+    seed_services(db)
+    rebuild_rollups(fix=True, db=db)
+    # Random bookings overlap; rebuild keeps them as they are
+    rebuild_schedules(db=db)
+    return {
+        'admin': admin['_id'],
+        'customers': [c['_id'] for c in customers],
+        'providers': [p['_id'] for p in providers],
+        'usernames': {'customer': [c['username'] for c in customers],
+                      'provider': [p['username'] for p in providers]},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db, _ = connect_bench_db()
+    counts = scaled_counts(args.scale)
+    generate(db, counts, args.seed)
+    print(f"Seeded {db.name}: " + ', '.join(f"{count} {name}" for name, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# benchmarks/streaming.py
+"""Peak memory and time-to-first-byte of /api/requests/pending, buffered
+(list + jsonify) versus streamed, over 100k seeded service requests.
+
+    python -m benchmarks.streaming [N]
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from flask import jsonify
+from benchmarks.common import connect_bench_db, make_app
+from routes.requests import requests_bp
+
+DEFAULT_DOCS = 100000
+
+
+def legacy_serialize(req):
+    req['_id'] = str(req['_id'])
+    req['createdAt'] = req['createdAt'].isoformat()
+    req['updatedAt'] = req['updatedAt'].isoformat()
+    return req
+
+
+def seed(db, n):
+    start = datetime.utcnow()
+    batch = []
+    for i in range(n):
+        batch.append({
+            'customerId': str(i % 1000),
+            'customerName': f'Customer {i % 1000}',
+            'serviceId': 'plumbing',
+            'serviceName': 'Service',
+            'status': 'pending',
+            'createdAt': start - timedelta(seconds=i),
+            'updatedAt': start - timedelta(seconds=i)
+        })
+        if len(batch) == 5000:
+            db.service_requests.insert_many(batch)
+            batch = []
+    if batch:
+        db.service_requests.insert_many(batch)
+    db.service_requests.create_index([('status', 1), ('createdAt', -1)])
+
+
+def measure(client, path, headers=None):
+    """Return (time to first byte, total time, peak traced memory, bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(path, headers=headers, buffered=False)
+    body = iter(response.response)
+    first = next(body)
+    ttfb = time.perf_counter() - start
+    size = len(first)
+    for chunk in body:
+        size += len(chunk)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    response.close()
+    return ttfb, total, peak, size
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DOCS
+    db, _ = connect_bench_db()
+    seed(db, n)
+
+    app = make_app((requests_bp, '/api/requests'))
+
+    @app.route('/buffered')
+    def buffered():
+        # What the endpoint did before streaming
+        docs = list(db.service_requests.find({'status': 'pending'}).sort('createdAt', -1))
+        return jsonify([legacy_serialize(d) for d in docs])
+
+    client = app.test_client()
+    print(f"{n} pending requests")
+    print(f"{'mode':<10} {'ttfb ms':>10} {'total ms':>10} {'peak MiB':>10} {'bytes':>12}")
+    for mode, path, headers in (
+        ('buffered', '/buffered', None),
+        ('json', '/api/requests/pending', None),
+        ('ndjson', '/api/requests/pending', {'Accept': 'application/x-ndjson'}),
+    ):
+        ttfb, total, peak, size = measure(client, path, headers)
+        print(f"{mode:<10} {ttfb * 1000:>10.1f} {total * 1000:>10.1f} {peak / 2**20:>10.1f} {size:>12}")
+
+
+if __name__ == '__main__':
+    main()
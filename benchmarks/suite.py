@@ -0,0 +1,247 @@
+# benchmarks/suite.py
+"""End-to-end benchmark of every API blueprint on synthetic data.
+
+Seeds the scratch database (see benchmarks/seed.py), then drives each
+scenario with concurrent clients through the real routes, including JWT
+checks, and reports throughput, p50/p95/p99 latency, MongoDB commands and
+response bytes per request. Clients send Accept-Encoding like a browser;
+--identity turns that off to measure the uncompressed baseline. Results are
+saved as JSON; --compare flags scenarios that got slower than an earlier run.
+
+    python -m benchmarks.suite --scale 0.2 --requests 500 --concurrency 16
+    python -m benchmarks.suite --compare benchmarks/results/<earlier>.json
+    python -m benchmarks.suite --only frontend.home frontend.login --identity
+"""
+
+import os
+
+# Login scenarios would otherwise be throttled by lib.rate_limit; must be
+# set before the routes are imported
+for _name in ('LOGIN_IP_BURST', 'LOGIN_IP_PER_MINUTE', 'LOGIN_USER_BURST', 'LOGIN_USER_PER_MINUTE'):
+    os.environ.setdefault(_name, '1000000000')
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from benchmarks.common import connect_bench_db, make_app, percentiles
+from benchmarks.seed import BENCH_PASSWORD, SERVICES, LAT_RANGE, LNG_RANGE, generate, scaled_counts
+from lib.assets import init_assets
+from lib.auth import generate_token
+from lib.compression import init_compression
+from routes.admin import admin_bp
+from routes.auth import auth_bp
+from routes.bookings import bookings_bp
+from routes.feed import feed_bp
+from routes.frontend import frontend_bp
+from routes.requests import requests_bp
+from routes.services import services_bp
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+WARMUP_REQUESTS = 20
+BROWSER_ACCEPT_ENCODING = 'gzip, deflate, br'
+
+
+def build_scenarios(ids, rng):
+    """{name: make_request} where make_request() -> (method, path, user, json_body).
+
+    user is (user_id, role) to send a bearer token for, or None.
+    """
+    lock = threading.Lock()
+
+    def draw(method, *args):
+        # One seeded generator shared by every client thread
+        with lock:
+            return getattr(rng, method)(*args)
+
+    def pick(items):
+        return draw('choice', items)
+
+    def customer():
+        return pick(ids['customers']), 'customer'
+
+    def provider():
+        return pick(ids['providers']), 'provider'
+
+    admin = (ids['admin'], 'admin')
+    hour_ago = (datetime.utcnow() - timedelta(hours=1)).isoformat() + 'Z'
+    day_ago = (datetime.utcnow() - timedelta(days=1)).isoformat() + 'Z'
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    return {
+        'auth.login': lambda: ('POST', '/api/auth/login', None, {
+            'username': pick(ids['usernames']['customer']), 'password': BENCH_PASSWORD, 'role': 'customer'}),
+        'auth.signup': lambda: ('POST', '/api/auth/signup', None, {
+            'username': f"signup_{uuid.uuid4().hex}", 'email': f"{uuid.uuid4().hex}@example.com",
+            'password': BENCH_PASSWORD, 'fullName': 'Bench Signup'}),
+        'services.services': lambda: ('GET', '/api/services', None, None),
+        'services.providers': lambda: ('GET', f"/api/providers?service={pick(SERVICES)}", None, None),
+        'services.providers (geo)': lambda: ('GET', (
+            f"/api/providers?lat={draw('uniform', *LAT_RANGE):.5f}&lng={draw('uniform', *LNG_RANGE):.5f}"
+            f"&radius_km=5"), None, None),
+        # Quarter-hour starts over 30 days, so most attempts find the slot free
+        'services.book': lambda: ('POST', '/api/book', customer(), {
+            'customer_id': str(pick(ids['customers'])), 'provider_id': str(pick(ids['providers'])),
+            'service_type': pick(SERVICES),
+            'booking_time': (today + timedelta(days=draw('randint', 1, 30),
+                                               minutes=15 * draw('randrange', 32, 72))).isoformat(),
+            'duration_minutes': 60, 'price': 500}),
+        'services.availability (week)': lambda: ('GET', f"/api/availability?service={pick(SERVICES)}", None, None),
+        'services.provider_availability': lambda: ('GET', (
+            f"/api/providers/{pick(ids['providers'])}/availability"
+            f"?start={(today + timedelta(days=draw('randint', 1, 14), hours=10)).isoformat()}"
+            f"&duration_minutes=60"), None, None),
+        'bookings.my_bookings (customer)': lambda: ('GET', '/api/my-bookings', customer(), None),
+        'bookings.my_bookings (provider)': lambda: ('GET', '/api/my-bookings?status=pending', provider(), None),
+        'requests.pending': lambda: ('GET', '/api/requests/pending', None, None),
+        'requests.pending (delta)': lambda: ('GET', f"/api/requests/pending?updated_since={hour_ago}", None, None),
+        'requests.my_requests': lambda: ('GET', '/api/requests/my-requests', customer(), None),
+        'feed.jobs (delta)': lambda: ('GET', f"/api/feed/jobs?since={day_ago}", provider(), None),
+        'admin.disputes': lambda: ('GET', '/api/admin/disputes', admin, None),
+        'admin.daily_bookings': lambda: ('GET', '/api/admin/reports/daily-bookings', admin, None),
+        'admin.provider_activity': lambda: ('GET', '/api/admin/reports/provider-activity', admin, None),
+        'frontend.home': lambda: ('GET', '/', None, None),
+        'frontend.login': lambda: ('GET', '/login', None, None),
+        'frontend.customer_dashboard': lambda: ('GET', '/customer/dashboard', customer(), None),
+    }
+
+
+def run_scenario(app, make_request, tokens, counter, n_requests, concurrency, accept_encoding=None):
+    def one(_):
+        method, path, user, body = make_request()
+        headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+        if user is not None:
+            token = tokens.get(user)
+            if token is None:
+                token = tokens[user] = generate_token(str(user[0]), user[1])
+            headers['Authorization'] = f"Bearer {token}"
+        client = app.test_client()
+        start = time.perf_counter()
+        response = client.open(path, method=method, headers=headers, json=body)
+        size = len(response.get_data())  # drains streamed bodies; bytes as sent
+        return time.perf_counter() - start, response.status_code, size
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(WARMUP_REQUESTS)))
+        counter.reset()
+        start = time.perf_counter()
+        outcomes = list(pool.map(one, range(n_requests)))
+        wall = time.perf_counter() - start
+
+    latencies = [elapsed for elapsed, _, _ in outcomes]
+    errors = sum(1 for _, status, _ in outcomes if status >= 400)
+    p = percentiles(latencies)
+    return {
+        'requests': n_requests,
+        'errors': errors,
+        'throughput_rps': round(n_requests / wall, 1),
+        'p50_ms': round(p[50] * 1000, 2),
+        'p95_ms': round(p[95] * 1000, 2),
+        'p99_ms': round(p[99] * 1000, 2),
+        'db_ops_per_request': round(counter.count / n_requests, 2),
+        'bytes_per_request': round(sum(size for _, _, size in outcomes) / n_requests),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print p95 and throughput changes against a previous run; returns the regressed scenario names"""
+    regressed = []
+    print(f"\nvs {baseline['started_at']} ({baseline.get('commit')}):")
+    for name, now in results.items():
+        before = baseline['scenarios'].get(name)
+        if not before:
+            continue
+        p95_change = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0
+        rps_change = (now['throughput_rps'] - before['throughput_rps']) / before['throughput_rps'] \
+            if before['throughput_rps'] else 0
+        flag = ''
+        if p95_change > threshold or rps_change < -threshold:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        bytes_change = ''
+        if before.get('bytes_per_request'):
+            bytes_change = f"  bytes {(now['bytes_per_request'] - before['bytes_per_request']) / before['bytes_per_request']:+7.1%}"
+        print(f"  {name:<34} p95 {p95_change:+7.1%}  rps {rps_change:+7.1%}{bytes_change}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=300, help='measured requests per scenario')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--only', nargs='+', help='scenario names (default: all)')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/bench-<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative change counted as a regression')
+    parser.add_argument('--identity', action='store_true', help='send no Accept-Encoding (uncompressed responses)')
+    args = parser.parse_args()
+
+    db, counter = connect_bench_db()
+    counts = scaled_counts(args.scale)
+    print(f"Seeding {db.name}: " + ', '.join(f"{count} {name}" for name, count in counts.items()))
+    ids = generate(db, counts, args.seed)
+
+    app = make_app((auth_bp, '/api/auth'), (services_bp, '/api'), (bookings_bp, '/api'),
+                   (requests_bp, '/api/requests'), (admin_bp, '/api/admin'), (feed_bp, '/api/feed'),
+                   (frontend_bp, None))
+    init_compression(app)
+    init_assets(app)
+    accept_encoding = None if args.identity else BROWSER_ACCEPT_ENCODING
+    scenarios = build_scenarios(ids, random.Random(args.seed))
+    names = args.only or list(scenarios)
+    tokens = {}
+
+    started_at = datetime.utcnow().isoformat() + 'Z'
+    results = {}
+    print(f"\n{'scenario':<34} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'db ops':>7} {'bytes':>8} {'errors':>6}")
+    for name in names:
+        result = run_scenario(app, scenarios[name], tokens, counter, args.requests, args.concurrency,
+                              accept_encoding)
+        results[name] = result
+        print(f"{name:<34} {result['throughput_rps']:>8.1f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f} {result['db_ops_per_request']:>7.2f} {result['bytes_per_request']:>8} "
+              f"{result['errors']:>6}")
+
+    run = {
+        'started_at': started_at,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'scale': args.scale,
+        'seed': args.seed,
+        'counts': counts,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'accept_encoding': accept_encoding,
+        'scenarios': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{started_at[:19].replace(':', '')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(run, f, indent=2)
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressed = compare(results, json.load(f), args.threshold)
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/wsgi_scaling.py
+"""Throughput of gunicorn (wsgi:app) as the worker count grows.
+
+Starts gunicorn for each worker count, drives it with concurrent HTTP
+clients for a fixed time and prints requests/second. The app talks to
+whatever MONGODB_URI is configured, so point it at a disposable database.
+
+    python -m benchmarks.wsgi_scaling --workers 1 2 4 8 --path /api/services
+"""
+
+import argparse
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+HOST = '127.0.0.1'
+PORT = 5055
+
+
+def wait_until_up(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not come up at {url}")
+
+
+def drive(url, concurrency, duration):
+    """Hit url from `concurrency` threads for `duration` seconds; return (ok, errors)"""
+    stop = time.monotonic() + duration
+    ok, errors = [0], [0]
+    lock = threading.Lock()
+
+    def client():
+        done, failed = 0, 0
+        while time.monotonic() < stop:
+            try:
+                urllib.request.urlopen(url, timeout=10).read()
+                done += 1
+            except Exception:
+                failed += 1
+        with lock:
+            ok[0] += done
+            errors[0] += failed
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    return ok[0], errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--path', default='/api/services')
+    args = parser.parse_args()
+
+    url = f"http://{HOST}:{PORT}{args.path}"
+    print(f"{'workers':>8} {'threads':>8} {'req/s':>10} {'errors':>8}")
+    for workers in args.workers:
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--bind', f'{HOST}:{PORT}', '--workers', str(workers),
+             '--threads', str(args.threads), '--access-logfile', '/dev/null', 'wsgi:app'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            wait_until_up(url)
+            drive(url, args.concurrency, 1.0)  # warm-up
+            ok, errors = drive(url, args.concurrency, args.duration)
+            print(f"{workers:>8} {args.threads:>8} {ok / args.duration:>10.0f} {errors:>8}")
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,4 +17,19 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret')
     JWT_SECRET = os.getenv('JWT_SECRET', 'dev-jwt-secret')
-    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
\ No newline at end of file
+    DEBUG = os.getenv('FLASK_DEBUG', 'False').lower() == 'true'
+
+    # MongoDB (read by lib/mongodb.py:init_db)
+    MONGODB_URI = os.getenv('MONGODB_URI')
+    MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'ayudabesh')
+    MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '100'))
+    MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', '0'))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+    MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', '5000'))
+    MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', '30000'))
+    # Comma-separated, e.g. "zstd,snappy,zlib"; zstd/snappy need their extra packages
+    MONGODB_COMPRESSORS = os.getenv('MONGODB_COMPRESSORS', '')
+    MONGODB_READ_PREFERENCE = os.getenv('MONGODB_READ_PREFERENCE', 'primary')
+    MONGODB_REPORTS_READ_PREFERENCE = os.getenv('MONGODB_REPORTS_READ_PREFERENCE', 'secondaryPreferred')
+    MONGODB_PING_ON_STARTUP = os.getenv('MONGODB_PING_ON_STARTUP', 'False').lower() == 'true'
@@ -0,0 +1,55 @@
+# gunicorn.conf.py
+"""gunicorn settings for wsgi:app. Every value can be overridden from the
+environment, e.g. WEB_CONCURRENCY=8 GUNICORN_THREADS=4."""
+
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '5000')}")
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Threads per worker; handlers spend most of their time waiting on MongoDB
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+worker_class = 'gthread'
+
+# Import the app once in the master; workers get it through fork()
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+# On SIGTERM workers get this long to finish in-flight requests
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+# Recycle workers now and then to cap slow leaks; jitter avoids restarting all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '1000'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def when_ready(server):
+    """Create indexes and seed data once, before any worker is forked"""
+    from app import bootstrap_db
+    from lib.indexes import IndexBuildError
+    from lib.mongodb import close_db
+    try:
+        bootstrap_db()
+    except IndexBuildError:
+        # Raised out of the arbiter, so gunicorn exits before forking workers
+        raise
+    except Exception as e:
+        server.log.error(f"Database bootstrap failed: {e}")
+    finally:
+        # Workers must not inherit the master's sockets
+        close_db()
+
+
+def post_fork(server, worker):
+    # lib.mongodb builds a fresh client on the first query in this process
+    server.log.info(f"Worker {worker.pid} started")
+
+
+def worker_exit(server, worker):
+    from lib.mongodb import close_db
+    from lib.password_pool import password_pool
+    close_db()
+    password_pool.shutdown()
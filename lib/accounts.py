@@ -0,0 +1,135 @@
+# lib/accounts.py
+
+import json
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from lib.mongodb import get_database
+from lib.password_pool import password_pool
+
+REQUIRED_FIELDS = ('username', 'email', 'password', 'fullName')
+IMPORT_ROLES = ('customer', 'provider')
+IMPORT_BATCH_SIZE = 1000
+
+# Messages for a duplicate on each unique users index (see lib/indexes.py)
+DUPLICATE_MESSAGES = {
+    'username': 'Username already exists',
+    'email': 'Email already in use',
+}
+
+def duplicate_key_message(error) -> str:
+    """User-facing message for a DuplicateKeyError or a bulk write error entry"""
+    details = error.details if isinstance(error, DuplicateKeyError) else error
+    details = details or {}
+    fields = list((details.get('keyPattern') or {}).keys())
+    if not fields:
+        # Older servers only name the index in the message
+        message = details.get('errmsg', '')
+        fields = [field for field in DUPLICATE_MESSAGES if f"{field}_unique" in message]
+    for field in fields:
+        if field in DUPLICATE_MESSAGES:
+            return DUPLICATE_MESSAGES[field]
+    return 'User already exists'
+
+def existing_user_message(users, username: str, email: str):
+    """DUPLICATE_MESSAGES entry if username or email is taken, else None.
+
+    One indexed lookup before the KDF, so repeated signups for a taken name
+    don't occupy the password pool. The unique indexes still decide races.
+    """
+    existing = users.find_one({'$or': [{'username': username}, {'email': email}]},
+                              {'username': 1})
+    if existing is None:
+        return None
+    field = 'username' if existing.get('username') == username else 'email'
+    return DUPLICATE_MESSAGES[field]
+
+def new_user(username, email, password_hash, full_name, role, **profile) -> dict:
+    """A users document as signup and imports create it"""
+    return {
+        'username': username,
+        'email': email,
+        'password': password_hash,
+        'fullName': full_name,
+        'role': role,
+        **profile,
+        'createdAt': datetime.utcnow()
+    }
+
+def _provider_profile(row: dict) -> dict:
+    # Same inputs as POST /api/update-profile
+    return {
+        'services_offered': row.get('services', []),
+        'hourly_rate': row.get('hourly_rate', 500),
+        'location': row.get('location', ''),
+        'description': row.get('description', ''),
+        'is_verified': False
+    }
+
+def _validate(row, default_role: str):
+    if not isinstance(row, dict):
+        return None, 'Row must be an object'
+    missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing:
+        return None, f"Missing required fields: {', '.join(missing)}"
+    role = row.get('role', default_role)
+    if role not in IMPORT_ROLES:
+        return None, f"role must be one of: {', '.join(IMPORT_ROLES)}"
+    return role, None
+
+def import_users(rows: list, default_role: str = 'provider', db=None) -> dict:
+    """Register many users at once.
+
+    Rows are validated, their passwords hashed across the whole password
+    pool, then inserted with insert_many(ordered=False) so one conflict
+    doesn't stop the rest. Returns {"inserted": n, "errors": [{"row": i,
+    "username": ..., "error": ...}]} with i the row's index in rows.
+    """
+    db = db if db is not None else get_database()
+    errors, valid = [], []
+    for i, row in enumerate(rows):
+        role, error = _validate(row, default_role)
+        if error:
+            errors.append({'row': i, 'username': row.get('username') if isinstance(row, dict) else None,
+                           'error': error})
+        else:
+            valid.append((i, row, role))
+
+    inserted = 0
+    for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+        batch = valid[start:start + IMPORT_BATCH_SIZE]
+        hashes = password_pool.hash_many([row['password'] for _, row, _ in batch])
+        docs = [
+            new_user(row['username'], row['email'], password_hash, row['fullName'], role,
+                     **(_provider_profile(row) if role == 'provider' else {}))
+            for (_, row, role), password_hash in zip(batch, hashes)
+        ]
+        try:
+            inserted += len(db.users.insert_many(docs, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details['nInserted']
+            for write_error in e.details['writeErrors']:
+                i, row, _ = batch[write_error['index']]
+                message = duplicate_key_message(write_error) if write_error['code'] == 11000 \
+                    else write_error.get('errmsg', 'Insert failed')
+                errors.append({'row': i, 'username': row['username'], 'error': message})
+
+    errors.sort(key=lambda e: e['row'])
+    return {'inserted': inserted, 'errors': errors}
+
+accounts_cli = AppGroup('users', help='Manage user accounts.')
+
+@accounts_cli.command('import')
+@click.argument('path', type=click.File('r'))
+@click.option('--role', default='provider', type=click.Choice(IMPORT_ROLES),
+              help='Role for rows that do not set one.')
+def import_command(path, role):
+    """Register users from a JSON array or JSON-lines file."""
+    text = path.read()
+    rows = json.loads(text) if text.lstrip().startswith('[') else \
+        [json.loads(line) for line in text.splitlines() if line.strip()]
+    result = import_users(rows, default_role=role)
+    for error in result['errors']:
+        click.echo(f"row {error['row']} ({error['username']}): {error['error']}", err=True)
+    click.echo(f"{result['inserted']} user(s) imported, {len(result['errors'])} rejected")
@@ -0,0 +1,265 @@
+# lib/assets.py
+"""Static asset build and serving.
+
+`flask assets build` writes content-hashed copies of static/ and
+public/services/ to static/dist/: CSS minified (and bundled, see BUNDLES),
+images resized into srcset widths and re-encoded as AVIF/WebP, text assets
+precompressed with gzip and brotli, plus a manifest.json.
+
+At runtime init_assets() makes url_for('static', filename=...) resolve to
+the hashed copy when the manifest has one, and serves static/dist/ with
+immutable caching and the precompressed variant the client accepts.
+Without a build everything falls back to the plain static files.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import re
+import shutil
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import AppGroup
+from werkzeug.security import safe_join
+
+try:
+    from PIL import Image
+except ImportError:  # optional: images are copied unchanged
+    Image = None
+
+try:
+    import pillow_avif  # noqa: F401  registers the AVIF plugin on older Pillow
+except ImportError:
+    pass
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz files are written
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+# Extra source directories (relative to the project root) and their prefix under static/
+EXTRA_SOURCES = [('public/services', 'services')]
+
+# Bundles are served as one file once built; until then their parts are linked separately
+BUNDLES = {
+    'css/base.css': ['css/globals.css', 'css/tailwindcss.css'],
+}
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+IMAGE_WIDTHS = (64, 128, 256, 400, 800, 1200, 1600)
+IMAGE_QUALITY = int(os.getenv('ASSET_IMAGE_QUALITY', '80'))
+COMPRESS_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.html'}
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+SAVE_FORMATS = {
+    'image/avif': ('AVIF', '.avif'),
+    'image/webp': ('WEBP', '.webp'),
+    'image/jpeg': ('JPEG', '.jpg'),
+    'image/png': ('PNG', '.png'),
+}
+
+_manifest = {'files': {}, 'images': {}}
+
+# Build
+
+def minify_css(css: str) -> str:
+    """Conservative CSS minifier: comments, whitespace and redundant semicolons"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+def _strip_bundled_imports(css: str, parts: list) -> str:
+    # @import of another part of the same bundle is already inlined
+    def keep(match):
+        target = match.group(2)
+        target = target if target.endswith('.css') else target + '.css'
+        return '' if any(part.endswith('/' + target) for part in parts) else match.group(0)
+    return re.sub(r'@import\s+(url\()?[\'"]?([^\'");]+)[\'"]?\)?\s*;', keep, css)
+
+def _hashed(rel_path: str, data: bytes) -> str:
+    stem, ext = os.path.splitext(rel_path)
+    return f"{DIST_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+
+def _write(static_folder: str, dist_path: str, data: bytes):
+    path = os.path.join(static_folder, dist_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    if os.path.splitext(dist_path)[1] in COMPRESS_EXTENSIONS:
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzip.compress(data, compresslevel=9, mtime=0))
+        if brotli is not None:
+            with open(path + '.br', 'wb') as f:
+                f.write(brotli.compress(data, quality=11))
+
+def _emit(static_folder: str, rel_path: str, data: bytes) -> str:
+    dist_path = _hashed(rel_path, data)
+    _write(static_folder, dist_path, data)
+    return dist_path
+
+def _image_formats(source_mimetype: str) -> list:
+    # AVIF is native from Pillow 11.3, earlier through pillow-avif-plugin
+    Image.init()
+    formats = [mimetype for mimetype in ('image/avif', 'image/webp')
+               if SAVE_FORMATS[mimetype][0] in Image.SAVE]
+    if source_mimetype not in formats:
+        formats.append(source_mimetype)
+    return formats
+
+def _encode(image, mimetype: str) -> bytes:
+    fmt = SAVE_FORMATS[mimetype][0]
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    elif fmt != 'JPEG' and image.mode == 'P':
+        image = image.convert('RGBA')
+    buf = io.BytesIO()
+    options = {'optimize': True} if fmt in ('JPEG', 'PNG') else {}
+    if fmt != 'PNG':
+        options['quality'] = IMAGE_QUALITY
+    image.save(buf, fmt, **options)
+    return buf.getvalue()
+
+def _build_image(static_folder: str, rel_path: str, data: bytes) -> dict:
+    """Resize one image into every IMAGE_WIDTHS step below its own width, per format"""
+    source_mimetype = mimetypes.guess_type(rel_path)[0]
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        width, height = image.size
+        widths = [w for w in IMAGE_WIDTHS if w < width] + [width]
+        stem = os.path.splitext(rel_path)[0]
+        sources = {}
+        for mimetype in _image_formats(source_mimetype):
+            ext = SAVE_FORMATS[mimetype][1]
+            sources[mimetype] = []
+            for w in widths:
+                resized = image if w == width else image.resize((w, round(height * w / width)), Image.LANCZOS)
+                variant = _emit(static_folder, f"{stem}-{w}w{ext}", _encode(resized, mimetype))
+                sources[mimetype].append([w, variant])
+    return {'width': width, 'height': height, 'fallback': source_mimetype, 'sources': sources}
+
+def _sources(static_folder: str, root: str):
+    """(rel_path, absolute_path) of every file to build, skipping earlier output"""
+    dirs = [(static_folder, '')] + [(os.path.join(root, src), prefix) for src, prefix in EXTRA_SOURCES]
+    for base, prefix in dirs:
+        for dirpath, dirnames, filenames in os.walk(base):
+            if os.path.abspath(dirpath) == os.path.abspath(base):
+                dirnames[:] = [d for d in dirnames if d != DIST_DIR]
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                rel = os.path.relpath(path, base).replace(os.sep, '/')
+                yield (f"{prefix}/{rel}" if prefix else rel), path
+
+def build_assets(static_folder: str, root: str) -> dict:
+    """Rebuild static/dist/ from scratch; returns the manifest"""
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {'files': {}, 'images': {}}
+    contents = {}
+
+    for rel_path, path in _sources(static_folder, root):
+        with open(path, 'rb') as f:
+            data = f.read()
+        contents[rel_path] = data
+        ext = os.path.splitext(rel_path)[1].lower()
+        if ext == '.css':
+            data = minify_css(data.decode('utf-8')).encode('utf-8')
+        elif ext in IMAGE_EXTENSIONS and Image is not None:
+            manifest['images'][rel_path] = _build_image(static_folder, rel_path, data)
+        manifest['files'][rel_path] = _emit(static_folder, rel_path, data)
+
+    for name, parts in BUNDLES.items():
+        css = '\n'.join(_strip_bundled_imports(contents[part].decode('utf-8'), parts) for part in parts)
+        manifest['files'][name] = _emit(static_folder, name, minify_css(css).encode('utf-8'))
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+assets_cli = AppGroup('assets', help='Build fingerprinted static assets.')
+
+@assets_cli.command('build')
+def build_command():
+    """Write hashed, minified, resized and precompressed assets to static/dist."""
+    app = current_app
+    manifest = build_assets(app.static_folder, app.root_path)
+    if Image is None:
+        click.echo("Pillow not installed: images copied without resizing", err=True)
+    if brotli is None:
+        click.echo("brotli not installed: only gzip variants written", err=True)
+    click.echo(f"{len(manifest['files'])} files, {len(manifest['images'])} images -> "
+               f"{os.path.join(app.static_folder, DIST_DIR)}")
+
+# Runtime
+
+def bundle_urls(name: str) -> list:
+    """URLs to link for a BUNDLES entry: the built bundle, or its parts in development"""
+    if name in _manifest['files']:
+        return [url_for('static', filename=name)]
+    return [url_for('static', filename=part) for part in BUNDLES[name]]
+
+def _srcset(variants) -> str:
+    return ', '.join(f"{url_for('static', filename=path)} {width}w" for width, path in variants)
+
+def picture_sources(name: str) -> list:
+    """<source> type/srcset pairs for the modern formats of a built image"""
+    image = _manifest['images'].get(name)
+    if not image:
+        return []
+    return [{'type': mimetype, 'srcset': _srcset(variants)}
+            for mimetype, variants in image['sources'].items() if mimetype != image['fallback']]
+
+def img_srcset(name: str) -> str:
+    """srcset for the <img> fallback (source format), empty before a build"""
+    image = _manifest['images'].get(name)
+    return _srcset(image['sources'][image['fallback']]) if image else ''
+
+def load_manifest(static_folder: str):
+    global _manifest
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            _manifest = json.load(f)
+    except FileNotFoundError:
+        _manifest = {'files': {}, 'images': {}}
+
+def init_assets(app):
+    """Resolve static URLs through the manifest and serve built assets"""
+    load_manifest(app.static_folder)
+    app.jinja_env.globals.update(bundle_urls=bundle_urls, picture_sources=picture_sources,
+                                 img_srcset=img_srcset)
+
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == 'static':
+            hashed = _manifest['files'].get(values.get('filename'))
+            if hashed:
+                values['filename'] = hashed
+
+    send_static_file = app.view_functions['static']
+
+    def static(filename):
+        if not filename.startswith(DIST_DIR + '/'):
+            return send_static_file(filename=filename)
+        # Hashed names never change content: cache forever, prefer precompressed
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            path = safe_join(app.static_folder, filename + suffix)
+            if request.accept_encodings[encoding] and path and os.path.isfile(path):
+                response = send_from_directory(app.static_folder, filename + suffix, mimetype=mimetype)
+                response.headers['Content-Encoding'] = encoding
+                break
+        else:
+            response = send_from_directory(app.static_folder, filename, mimetype=mimetype)
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        return response
+
+    app.view_functions['static'] = static
@@ -1,19 +1,34 @@
 # lib/auth.py
 
 import os
+import hashlib
+import time
 from datetime import datetime, timedelta
 import jwt
-from werkzeug.security import generate_password_hash, check_password_hash
 from lib.mongodb import get_database
+from lib.cache import TTLCache
+from lib.password_pool import password_pool, needs_rehash
 from bson.objectid import ObjectId
 
 SECRET_KEY = os.getenv('SECRET_KEY', 'JesmundIvanClariceGailMayeoh!')
 
+# User documents without the password hash, keyed by str(_id)
+USER_PROJECTION = {'password': 0}
+user_cache = TTLCache(
+    maxsize=int(os.getenv('USER_CACHE_SIZE', '10000')),
+    ttl=float(os.getenv('USER_CACHE_TTL', '60'))
+)
+
+# Decoded payloads of already-verified tokens, keyed by SHA-256 of the token
+# and kept until the token's own exp
+token_cache = TTLCache(maxsize=int(os.getenv('TOKEN_CACHE_SIZE', '10000')))
+
+# Both run the KDF in lib.password_pool and may raise PasswordPoolBusy
 def hash_password(password: str) -> str:
-    return generate_password_hash(password)
+    return password_pool.hash(password)
 
 def verify_password(password: str, hashed_password: str) -> bool:
-    return check_password_hash(hashed_password, password)
+    return password_pool.check(hashed_password, password)
 
 def generate_token(user_id: str, role: str, expires_in: int = None) -> str:
     """Generate a JWT token that includes user role"""
@@ -33,23 +48,59 @@ def generate_token(user_id: str, role: str, expires_in: int = None) -> str:
     return jwt.encode(payload, SECRET_KEY, algorithm='HS256')
 
 def verify_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
     except (jwt.ExpiredSignatureError, jwt.InvalidTokenError):
         return None
 
+    ttl = payload.get('exp', 0) - time.time()
+    if ttl > 0:
+        token_cache.set(key, payload, ttl=ttl)
+    return dict(payload)
+
+def get_user(user_id: str) -> dict:
+    """Return the user (without password) for an id, served from user_cache when warm"""
+    user_id = str(user_id)
+    user = user_cache.get(user_id)
+    if user is None:
+        db = get_database()
+        user = db.users.find_one({'_id': ObjectId(user_id)}, USER_PROJECTION)
+        if user is None:
+            return None
+        user_cache.set(user_id, user)
+    # Callers may mutate what they get back; keep the cached entry intact
+    return dict(user)
+
+async def get_user_async(motor_db, user_id: str) -> dict:
+    """get_user() for the async API; shares user_cache with the sync path"""
+    user_id = str(user_id)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await motor_db.users.find_one({'_id': ObjectId(user_id)}, USER_PROJECTION)
+        if user is None:
+            return None
+        user_cache.set(user_id, user)
+    return dict(user)
+
+def invalidate_user(user_id: str):
+    """Drop a user from user_cache after a write that changes their document"""
+    user_cache.delete(str(user_id))
+
 def get_user_from_token(token: str) -> dict:
     payload = verify_token(token)
     if not payload:
         return None
     
     try:
-        db = get_database()
         user_id = payload.get('user_id')
         if not user_id:
             return None
-        user = db.users.find_one({'_id': ObjectId(user_id)})
-        return user
+        return get_user(user_id)
     except Exception as e:
         print(f"Error getting user from token: {e}")
-        return None
\ No newline at end of file
+        return None
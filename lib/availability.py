@@ -0,0 +1,234 @@
+# lib/availability.py
+
+import os
+from bisect import bisect_left
+from datetime import datetime, timedelta
+import click
+from flask.cli import AppGroup
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from lib.mongodb import get_database
+
+# Each provider's booked time lives in one provider_schedules document:
+#   {_id: provider_id, intervals: [{start, end, booking_id}], updated_at}
+# with intervals sorted by start. Reserving a slot is a single conditional
+# update of that document, so two overlapping bookings can never both get
+# in, whichever worker handles them. backfill_schedules() runs at every
+# bootstrap so bookings made before schedules existed still hold their time.
+
+DEFAULT_BOOKING_MINUTES = int(os.getenv('DEFAULT_BOOKING_MINUTES', '60'))
+MIN_BOOKING_MINUTES = 15
+MAX_BOOKING_MINUTES = 12 * 60
+# Free slots are only offered inside these hours (same clock as booking_time)
+DAY_START_HOUR = int(os.getenv('AVAILABILITY_DAY_START', '8'))
+DAY_END_HOUR = int(os.getenv('AVAILABILITY_DAY_END', '18'))
+MAX_WINDOW_DAYS = 31
+# Intervals that ended longer ago than this are dropped by prune/rebuild
+SCHEDULE_RETENTION_DAYS = int(os.getenv('SCHEDULE_RETENTION_DAYS', '7'))
+
+# Booking states that hold the provider's time; anything else frees it
+BUSY_STATUSES = ('pending', 'accepted', 'completed')
+
+def parse_duration(value) -> int:
+    """Booking length in minutes from a request body value; raises ValueError"""
+    if value is None:
+        return DEFAULT_BOOKING_MINUTES
+    if isinstance(value, bool) or not isinstance(value, int) \
+            or not MIN_BOOKING_MINUTES <= value <= MAX_BOOKING_MINUTES:
+        raise ValueError(f"duration_minutes must be a whole number from "
+                         f"{MIN_BOOKING_MINUTES} to {MAX_BOOKING_MINUTES}")
+    return value
+
+def _overlapping(start: datetime, end: datetime) -> dict:
+    return {'$elemMatch': {'start': {'$lt': end}, 'end': {'$gt': start}}}
+
+class Schedule:
+    """Busy intervals of one provider, sorted by start, with bisect lookups"""
+
+    def __init__(self, intervals=()):
+        self.intervals = sorted(intervals, key=lambda i: i['start'])
+        self._starts = [i['start'] for i in self.intervals]
+
+    def conflicts(self, start: datetime, end: datetime) -> list:
+        """Intervals overlapping [start, end)"""
+        # Everything from here on starts at or after end
+        stop = bisect_left(self._starts, end)
+        found = []
+        for interval in reversed(self.intervals[:stop]):
+            if interval['end'] > start:
+                found.append(interval)
+            elif interval['start'] < start - timedelta(minutes=MAX_BOOKING_MINUTES):
+                # Nothing earlier can reach start
+                break
+        return found[::-1]
+
+    def is_free(self, start: datetime, end: datetime) -> bool:
+        return not self.conflicts(start, end)
+
+    def free_windows(self, start: datetime, end: datetime, minutes: int) -> list:
+        """Free [start, end) ranges of at least `minutes` inside working hours"""
+        length = timedelta(minutes=minutes)
+        windows = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end:
+            day_start = max(start, day + timedelta(hours=DAY_START_HOUR))
+            day_end = min(end, day + timedelta(hours=DAY_END_HOUR))
+            day += timedelta(days=1)
+            if day_start >= day_end:
+                continue
+            cursor = day_start
+            for busy in self.conflicts(day_start, day_end):
+                if busy['start'] - cursor >= length:
+                    windows.append({'start': cursor, 'end': busy['start']})
+                cursor = max(cursor, busy['end'])
+            if day_end - cursor >= length:
+                windows.append({'start': cursor, 'end': day_end})
+        return windows
+
+def load_schedules(provider_ids: list, db=None) -> dict:
+    """{provider_id: Schedule} in one query; providers without bookings get an empty one"""
+    db = db if db is not None else get_database()
+    schedules = {doc['_id']: Schedule(doc.get('intervals', []))
+                 for doc in db.provider_schedules.find({'_id': {'$in': list(provider_ids)}})}
+    return {provider_id: schedules.get(provider_id, Schedule()) for provider_id in provider_ids}
+
+def reserve(provider_id, start: datetime, end: datetime, booking_id, db=None) -> bool:
+    """Claim [start, end) for booking_id; False if it overlaps a booked interval.
+
+    The overlap check and the write are one document update. When nothing
+    matches, the upsert collides with the existing _id instead of adding a
+    second schedule, which is reported as a conflict.
+    """
+    db = db if db is not None else get_database()
+    update = {
+        '$push': {'intervals': {'$each': [{'start': start, 'end': end, 'booking_id': booking_id}],
+                                '$sort': {'start': 1}}},
+        '$set': {'updated_at': datetime.utcnow()}
+    }
+    query = {'_id': provider_id, 'intervals': {'$not': _overlapping(start, end)}}
+    # Retried once: two first-ever bookings of a provider can race on the upsert
+    for _ in range(2):
+        try:
+            db.provider_schedules.update_one(query, update, upsert=True)
+            return True
+        except DuplicateKeyError:
+            continue
+    return False
+
+def release(provider_id, booking_id, db=None):
+    """Give a booking's interval back"""
+    release_many([(provider_id, booking_id)], db)
+
+def release_many(bookings: list, db=None):
+    """release() for (provider_id, booking_id) pairs, one write per provider"""
+    db = db if db is not None else get_database()
+    by_provider = {}
+    for provider_id, booking_id in bookings:
+        by_provider.setdefault(provider_id, []).append(booking_id)
+    if by_provider:
+        db.provider_schedules.bulk_write([
+            UpdateOne({'_id': provider_id}, {'$pull': {'intervals': {'booking_id': {'$in': booking_ids}}}})
+            for provider_id, booking_ids in by_provider.items()
+        ], ordered=False)
+
+def prune_schedules(db=None) -> int:
+    """Drop intervals that ended before the retention window; returns schedules touched"""
+    db = db if db is not None else get_database()
+    cutoff = datetime.utcnow() - timedelta(days=SCHEDULE_RETENTION_DAYS)
+    return db.provider_schedules.update_many(
+        {'intervals.end': {'$lt': cutoff}},
+        {'$pull': {'intervals': {'end': {'$lt': cutoff}}}}
+    ).modified_count
+
+def _booked_intervals(db):
+    """{_id: provider_id, intervals} from the bookings that hold time, sorted by start"""
+    cutoff = datetime.utcnow() - timedelta(days=SCHEDULE_RETENTION_DAYS)
+    default_ms = DEFAULT_BOOKING_MINUTES * 60 * 1000
+    pipeline = [
+        {'$match': {'status': {'$in': list(BUSY_STATUSES)}, 'booking_time': {'$type': 'date'}}},
+        {'$project': {
+            'provider_id': 1,
+            'start': '$booking_time',
+            'end': {'$ifNull': ['$end_time', {'$add': ['$booking_time', default_ms]}]}
+        }},
+        {'$match': {'end': {'$gte': cutoff}}},
+        {'$sort': {'start': 1}},
+        {'$group': {'_id': '$provider_id',
+                    'intervals': {'$push': {'start': '$start', 'end': '$end', 'booking_id': '$_id'}}}}
+    ]
+    return db.bookings.aggregate(pipeline, allowDiskUse=True)
+
+def backfill_schedules(db=None) -> int:
+    """Add bookings missing from their provider's schedule; returns intervals added.
+
+    Unlike rebuild_schedules() it never removes or replaces anything, so it
+    is safe while bookings are being made.
+    """
+    db = db if db is not None else get_database()
+    now = datetime.utcnow()
+    ops = [
+        # Already present: the filter misses, the upsert hits the existing _id and is skipped
+        UpdateOne({'_id': doc['_id'], 'intervals.booking_id': {'$ne': interval['booking_id']}},
+                  {'$push': {'intervals': {'$each': [interval], '$sort': {'start': 1}}},
+                   '$set': {'updated_at': now}},
+                  upsert=True)
+        for doc in _booked_intervals(db) for interval in doc['intervals']
+    ]
+    if not ops:
+        return 0
+    try:
+        result = db.provider_schedules.bulk_write(ops, ordered=False).bulk_api_result
+    except BulkWriteError as e:
+        if any(error['code'] != 11000 for error in e.details['writeErrors']):
+            raise
+        result = e.details
+    return result['nModified'] + result['nUpserted']
+
+def rebuild_schedules(db=None) -> dict:
+    """Recreate every schedule from bookings.
+
+    Bookings from before durations existed get DEFAULT_BOOKING_MINUTES.
+    Run it while bookings are quiet: a slot reserved during the rebuild can
+    be overwritten.
+    Returns {"providers": n, "intervals": n, "overlaps": [(booking_id,
+    booking_id), ...]} where overlaps are double bookings already stored.
+    """
+    db = db if db is not None else get_database()
+    now = datetime.utcnow()
+    ops, seen, total, overlaps = [], [], 0, []
+    for doc in _booked_intervals(db):
+        intervals = doc['intervals']
+        latest = None
+        for interval in intervals:
+            if latest is not None and interval['start'] < latest['end']:
+                overlaps.append((latest['booking_id'], interval['booking_id']))
+            if latest is None or interval['end'] > latest['end']:
+                latest = interval
+        ops.append(ReplaceOne({'_id': doc['_id']}, {'intervals': intervals, 'updated_at': now}, upsert=True))
+        seen.append(doc['_id'])
+        total += len(intervals)
+    if ops:
+        db.provider_schedules.bulk_write(ops, ordered=False)
+    db.provider_schedules.delete_many({'_id': {'$nin': seen}})
+    return {'providers': len(seen), 'intervals': total, 'overlaps': overlaps}
+
+availability_cli = AppGroup('availability', help='Maintain provider schedules.')
+
+@availability_cli.command('rebuild')
+def rebuild_command():
+    """Recreate provider schedules from bookings and report double bookings."""
+    result = rebuild_schedules()
+    for first, second in result['overlaps']:
+        click.echo(f"overlap: {first} {second}", err=True)
+    click.echo(f"{result['intervals']} interval(s) for {result['providers']} provider(s), "
+               f"{len(result['overlaps'])} overlap(s)")
+
+@availability_cli.command('backfill')
+def backfill_command():
+    """Add bookings missing from provider schedules (also run at startup)."""
+    click.echo(f"{backfill_schedules()} interval(s) added")
+
+@availability_cli.command('prune')
+def prune_command():
+    """Drop intervals older than SCHEDULE_RETENTION_DAYS."""
+    click.echo(f"{prune_schedules()} schedule(s) pruned")
@@ -0,0 +1,104 @@
+# lib/catalogue.py
+
+import hashlib
+import os
+import threading
+import time
+from pymongo.errors import BulkWriteError
+from lib.mongodb import get_database
+from lib.json_provider import dumps
+
+DEFAULT_SERVICES = [
+    {"name": "Domestic Cleaning", "category": "cleaning", "description": "Home cleaning services"},
+    {"name": "Plumbing", "category": "plumbing", "description": "Pipe and fixture repairs"},
+    {"name": "Electrical Work", "category": "electrical", "description": "Wiring and electrical installations"},
+    {"name": "Pest Control", "category": "pest_control", "description": "Insect and rodent removal"},
+    {"name": "Appliance Installation", "category": "appliance", "description": "Installation of household appliances"},
+    {"name": "General Maintenance", "category": "maintenance", "description": "General home repair services"}
+]
+
+# Seconds a worker trusts its cached catalogue before re-reading the shared
+# version stamp; bounds how long another worker's change can go unnoticed
+VERSION_CHECK_INTERVAL = float(os.getenv('CATALOGUE_VERSION_CHECK', '5'))
+CATALOGUE_MAX_AGE = int(os.getenv('CATALOGUE_MAX_AGE', '60'))
+
+def seed_services(db=None):
+    """Insert the default services if the collection is empty (startup only)"""
+    db = db if db is not None else get_database()
+    if db.services.estimated_document_count() > 0:
+        return
+    try:
+        # Another worker may be seeding at the same time; the unique name
+        # index turns its rows into ignorable duplicate-key errors
+        db.services.insert_many([dict(s) for s in DEFAULT_SERVICES], ordered=False)
+    except BulkWriteError:
+        pass
+
+class ServiceCatalogue:
+    """Per-process cache of the encoded /api/services response.
+
+    A version counter in db.cache_versions is bumped on every change, and
+    each worker re-reads it at most every VERSION_CHECK_INTERVAL seconds.
+    """
+
+    KEY = 'services'
+
+    def __init__(self, check_interval: float = VERSION_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._body = None
+        self._etag = None
+        self._checked_at = 0.0
+
+    def _cached(self):
+        if self._body is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._body, self._etag
+        return None
+
+    def _store(self, version, services):
+        if self._body is None or version != self._version:
+            self._body = dumps(services)
+            self._etag = hashlib.sha1(self._body.encode('utf-8')).hexdigest()
+            self._version = version
+        self._checked_at = time.monotonic()
+        return self._body, self._etag
+
+    def get(self):
+        """Return (json_body, etag), reloading only if the version changed"""
+        cached = self._cached()
+        if cached:
+            return cached
+
+        with self._lock:
+            cached = self._cached()
+            if cached:
+                return cached
+            db = get_database()
+            stamp = db.cache_versions.find_one({'_id': self.KEY})
+            version = stamp['version'] if stamp else 0
+            services = None
+            if self._body is None or version != self._version:
+                services = list(db.services.find({}, {'_id': 0}).sort('name', 1))
+            return self._store(version, services)
+
+    async def get_async(self, motor_db):
+        """get() for the async API, reading through a Motor database"""
+        cached = self._cached()
+        if cached:
+            return cached
+        stamp = await motor_db.cache_versions.find_one({'_id': self.KEY})
+        version = stamp['version'] if stamp else 0
+        services = None
+        if self._body is None or version != self._version:
+            services = await motor_db.services.find({}, {'_id': 0}).sort('name', 1).to_list(None)
+        return self._store(version, services)
+
+    def invalidate(self):
+        """Bump the shared version and drop this worker's copy"""
+        db = get_database()
+        db.cache_versions.update_one({'_id': self.KEY}, {'$inc': {'version': 1}}, upsert=True)
+        with self._lock:
+            self._body = None
+
+service_catalogue = ServiceCatalogue()
@@ -0,0 +1,168 @@
+# lib/compression.py
+"""Negotiated gzip/brotli compression of HTML and JSON responses.
+
+Compression is WSGI middleware so it sees the final headers: buffered
+bodies under COMPRESS_MIN_SIZE are left alone, streamed bodies (no
+Content-Length) are compressed chunk by chunk and flushed after each one
+so clients still receive them incrementally. Responses that already carry
+a Content-Encoding (precompressed static files, cached pages) or answer a
+Range request (206) pass through.
+"""
+
+import os
+import zlib
+from werkzeug.http import parse_accept_header, parse_options_header
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '500'))
+COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+# Dynamic responses: quality 4 is close to gzip -6 in speed but smaller
+COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', '4'))
+COMPRESS_MIMETYPES = set(os.getenv(
+    'COMPRESS_MIMETYPES',
+    'text/html,application/json,application/x-ndjson,text/plain,text/css,application/javascript,image/svg+xml'
+).split(','))
+
+def supported_encodings() -> list:
+    """Content codings this process can produce, in server preference order"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def negotiate(accept_encoding: str):
+    """Best coding the client accepts ('br' or 'gzip'), else None"""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(supported_encodings())
+
+class _Gzip:
+    def __init__(self, level: int = COMPRESS_GZIP_LEVEL):
+        # wbits 16+ writes the gzip header and trailer
+        self._z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._z.compress(data)
+
+    def flush(self) -> bytes:
+        return self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush(zlib.Z_FINISH)
+
+class _Brotli:
+    def __init__(self, quality: int = COMPRESS_BROTLI_QUALITY):
+        self._c = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def flush(self) -> bytes:
+        return self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+def compressor(encoding: str):
+    return _Brotli() if encoding == 'br' else _Gzip()
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """One-shot compression of a complete body"""
+    c = compressor(encoding)
+    return c.compress(data) + c.finish()
+
+class _CompressedStream:
+    """Streamed body compressed chunk by chunk, flushed after every chunk"""
+
+    def __init__(self, body, encoding: str):
+        self._body = body
+        self._encoding = encoding
+
+    def __iter__(self):
+        c = compressor(self._encoding)
+        for chunk in self._body:
+            if chunk:
+                data = c.compress(chunk) + c.flush()
+                if data:
+                    yield data
+        yield c.finish()
+
+    def close(self):
+        if hasattr(self._body, 'close'):
+            self._body.close()
+
+def _compressible(status: str, headers) -> bool:
+    if not status.startswith('2') or status.startswith(('204', '206')):
+        return False
+    names = {name.lower(): value for name, value in headers}
+    if 'content-encoding' in names or 'no-transform' in names.get('cache-control', ''):
+        return False
+    # A byte range is of the identity body; encoding it would corrupt it
+    if 'content-range' in names:
+        return False
+    mimetype = parse_options_header(names.get('content-type', ''))[0]
+    if mimetype not in COMPRESS_MIMETYPES:
+        return False
+    length = names.get('content-length')
+    return length is None or int(length) >= COMPRESS_MIN_SIZE
+
+def _encoded_headers(headers, encoding: str, length=None) -> list:
+    out = []
+    vary = None
+    for name, value in headers:
+        lower = name.lower()
+        if lower == 'content-length':
+            continue
+        if lower == 'vary':
+            vary = value
+            continue
+        if lower == 'etag' and not value.startswith('W/'):
+            # The compressed bytes differ from what a strong tag promised
+            value = 'W/' + value
+        out.append((name, value))
+    out.append(('Vary', f"{vary}, Accept-Encoding" if vary else 'Accept-Encoding'))
+    out.append(('Content-Encoding', encoding))
+    if length is not None:
+        out.append(('Content-Length', str(length)))
+    return out
+
+class Compression:
+    """WSGI middleware compressing responses the client can decode"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        encoding = negotiate(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.wsgi_app(environ, start_response)
+
+        captured = []
+
+        def capture(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            # Flask never uses the legacy write() callable
+            return lambda data: None
+
+        body = self.wsgi_app(environ, capture)
+        status, headers, exc_info = captured
+        if not _compressible(status, headers):
+            start_response(status, headers, exc_info)
+            return body
+
+        if any(name.lower() == 'content-length' for name, _ in headers):
+            try:
+                data = compress(b''.join(body), encoding)
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+            start_response(status, _encoded_headers(headers, encoding, len(data)), exc_info)
+            return [data]
+
+        start_response(status, _encoded_headers(headers, encoding), exc_info)
+        return _CompressedStream(body, encoding)
+
+def init_compression(app):
+    """Wrap the app (outside the metrics middleware) in Compression"""
+    app.wsgi_app = Compression(app.wsgi_app)
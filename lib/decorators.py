@@ -4,16 +4,21 @@ from functools import wraps
 from flask import request, jsonify, redirect, url_for
 from lib.auth import verify_token
 
+def extract_token(req):
+    """Bearer token from the Authorization header, else the token cookie"""
+    token = None
+    if 'Authorization' in req.headers:
+        auth_header = req.headers['Authorization']
+        if auth_header.startswith('Bearer '):
+            token = auth_header.split(" ")[1]
+    if not token:
+        token = req.cookies.get('token')
+    return token
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                token = auth_header.split(" ")[1]
-        if not token:
-            token = request.cookies.get('token')
+        token = extract_token(request)
             
         if not token:
             if not request.path.startswith('/api/'):
@@ -0,0 +1,196 @@
+# lib/indexes.py
+
+import click
+from datetime import datetime
+from flask.cli import AppGroup
+from pymongo import ASCENDING, DESCENDING, GEOSPHERE, IndexModel
+from pymongo.errors import OperationFailure
+from bson.objectid import ObjectId
+from lib.mongodb import get_database
+
+# Every index the routes rely on, per collection. Names are fixed so that
+# re-running ensure_indexes() is a no-op once they exist.
+INDEXES = {
+    'users': [
+        IndexModel([('username', ASCENDING)], name='username_unique', unique=True),
+        IndexModel([('email', ASCENDING)], name='email_unique', unique=True),
+        # /api/providers: role + is_verified equality, then service/location filters
+        IndexModel([('role', ASCENDING), ('is_verified', ASCENDING),
+                    ('services_offered', ASCENDING), ('location', ASCENDING)],
+                   name='provider_search'),
+        IndexModel([('role', ASCENDING), ('is_verified', ASCENDING), ('services_offered', ASCENDING),
+                    ('hourly_rate', ASCENDING), ('_id', ASCENDING)],
+                   name='provider_service_rate'),
+        IndexModel([('role', ASCENDING), ('is_verified', ASCENDING), ('services_offered', ASCENDING),
+                    ('rating_avg', DESCENDING), ('_id', DESCENDING)],
+                   name='provider_service_rating'),
+        IndexModel([('role', ASCENDING), ('is_verified', ASCENDING), ('hourly_rate', ASCENDING),
+                    ('_id', ASCENDING)],
+                   name='provider_rate'),
+        IndexModel([('role', ASCENDING), ('is_verified', ASCENDING), ('rating_avg', DESCENDING),
+                    ('_id', DESCENDING)],
+                   name='provider_rating'),
+        # Provider-activity report sorted by total_jobs
+        IndexModel([('role', ASCENDING), ('stats.completed_jobs', DESCENDING), ('_id', DESCENDING)],
+                   name='provider_completed_jobs'),
+        # ... and sorted by avg_rating (the rating_avg rollup)
+        IndexModel([('role', ASCENDING), ('rating_avg', DESCENDING), ('_id', DESCENDING)],
+                   name='provider_rating_avg'),
+        # Radius search; $geoNear needs exactly one 2dsphere index
+        IndexModel([('role', ASCENDING), ('is_verified', ASCENDING), ('geo', GEOSPHERE)],
+                   name='provider_geo'),
+    ],
+    'bookings': [
+        # /api/my-bookings for customers and providers, newest first
+        IndexModel([('customer_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+                   name='customer_created'),
+        IndexModel([('provider_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)],
+                   name='provider_created'),
+        # Provider-activity report: completed jobs per provider
+        IndexModel([('provider_id', ASCENDING), ('status', ASCENDING)], name='provider_status'),
+        # Daily-bookings report
+        IndexModel([('created_at', DESCENDING)], name='created_at'),
+        # Job feed delta sync (/api/feed/jobs?since=)
+        IndexModel([('customer_id', ASCENDING), ('updated_at', ASCENDING)], name='customer_updated'),
+        IndexModel([('provider_id', ASCENDING), ('updated_at', ASCENDING)], name='provider_updated'),
+    ],
+    'service_requests': [
+        # /api/requests/pending
+        IndexModel([('status', ASCENDING), ('createdAt', DESCENDING)], name='status_created'),
+        # /api/requests/pending?updated_since=: changed rows and tombstones
+        IndexModel([('status', ASCENDING), ('updatedAt', ASCENDING)], name='status_updated'),
+        # /api/requests/my-requests
+        IndexModel([('customerId', ASCENDING), ('createdAt', DESCENDING)], name='customer_created'),
+        # Job feed delta sync: providers see every request, customers their own
+        IndexModel([('updatedAt', ASCENDING)], name='updated_at'),
+        IndexModel([('customerId', ASCENDING), ('updatedAt', ASCENDING)], name='customer_updated'),
+    ],
+    'disputes': [
+        # /api/admin/disputes, newest first
+        IndexModel([('created_at', DESCENDING)], name='created_at'),
+    ],
+    'services': [
+        IndexModel([('name', ASCENDING)], name='name_unique', unique=True),
+    ],
+    'rate_limits': [
+        # Drop login buckets once they would have refilled (RATE_LIMIT_STORE=mongo)
+        IndexModel([('expires_at', ASCENDING)], name='expires_at', expireAfterSeconds=0),
+    ],
+}
+
+# Representative query shape of each indexed route: (route, collection, filter, sort).
+# Values only need the right types; the planner's choice does not depend on them.
+_SAMPLE_ID = ObjectId()
+QUERY_SHAPES = [
+    ('POST /api/auth/login', 'users', {'username': 'u', 'role': 'customer'}, None),
+    ('GET /api/providers', 'users',
+     {'role': 'provider', 'is_verified': True, 'services_offered': 'plumbing',
+      'location': 'Cebu'}, None),
+    ('GET /api/providers?sort=rate', 'users',
+     {'role': 'provider', 'is_verified': True, 'services_offered': 'plumbing',
+      'hourly_rate': {'$gte': 300, '$lte': 800}}, [('hourly_rate', 1), ('_id', 1)]),
+    ('GET /api/providers?sort=rating', 'users',
+     {'role': 'provider', 'is_verified': True, 'rating_avg': {'$gte': 4}},
+     [('rating_avg', -1), ('_id', -1)]),
+    ('GET /api/my-bookings (customer)', 'bookings', {'customer_id': _SAMPLE_ID},
+     [('created_at', -1), ('_id', -1)]),
+    ('GET /api/my-bookings (provider)', 'bookings', {'provider_id': _SAMPLE_ID},
+     [('created_at', -1), ('_id', -1)]),
+    ('GET /api/admin/reports/daily-bookings', 'bookings', {'created_at': {'$gte': datetime(2000, 1, 1)}}, None),
+    ('GET /api/my-bookings/summary (customer)', 'bookings', {'customer_id': _SAMPLE_ID}, None),
+    ('GET /api/my-bookings/summary (provider)', 'bookings', {'provider_id': _SAMPLE_ID}, None),
+    ('GET /api/admin/reports/provider-activity', 'users', {'role': 'provider'}, [('_id', 1)]),
+    ('GET /api/admin/reports/provider-activity?sort=total_jobs', 'users',
+     {'role': 'provider'}, [('stats.completed_jobs', -1), ('_id', -1)]),
+    ('GET /api/admin/reports/provider-activity?sort=avg_rating', 'users',
+     {'role': 'provider'}, [('rating_avg', -1), ('_id', -1)]),
+    ('GET /api/requests/pending', 'service_requests', {'status': 'pending'}, [('createdAt', -1)]),
+    ('GET /api/requests/my-requests', 'service_requests', {'customerId': str(_SAMPLE_ID)}, [('createdAt', -1)]),
+    ('GET /api/requests/pending?updated_since=', 'service_requests',
+     {'status': 'pending', 'updatedAt': {'$gt': datetime(2000, 1, 1)}}, [('updatedAt', 1)]),
+    ('GET /api/requests/pending?updated_since= (removed)', 'service_requests',
+     {'status': {'$ne': 'pending'}, 'updatedAt': {'$gt': datetime(2000, 1, 1)}}, None),
+    ('GET /api/requests/my-requests?updated_since=', 'service_requests',
+     {'customerId': str(_SAMPLE_ID), 'updatedAt': {'$gt': datetime(2000, 1, 1)}}, [('updatedAt', 1)]),
+    ('GET /api/feed/jobs (bookings)', 'bookings',
+     {'provider_id': _SAMPLE_ID, 'updated_at': {'$gt': datetime(2000, 1, 1)}}, [('updated_at', 1), ('_id', 1)]),
+    ('GET /api/feed/jobs (requests)', 'service_requests',
+     {'updatedAt': {'$gt': datetime(2000, 1, 1)}}, [('updatedAt', 1), ('_id', 1)]),
+    ('GET /api/admin/disputes', 'disputes', {}, [('created_at', -1)]),
+]
+
+# Collections whose indexes enforce correctness (signup relies on the
+# unique users indexes), not just speed
+REQUIRED_INDEXES = ('users',)
+
+class IndexBuildError(RuntimeError):
+    """A REQUIRED_INDEXES collection could not be indexed; the app must not start"""
+
+def ensure_indexes(db=None) -> dict:
+    """Create any missing indexes from INDEXES; safe to call on every startup.
+
+    Returns {collection: [index names]}. A collection whose indexes cannot be
+    built (e.g. duplicate usernames blocking a unique index) is reported and
+    skipped so the others still get created; if it is one of
+    REQUIRED_INDEXES, IndexBuildError is raised afterwards.
+    """
+    db = db if db is not None else get_database()
+    created, failed = {}, []
+    for collection, models in INDEXES.items():
+        try:
+            created[collection] = db[collection].create_indexes(models)
+        except OperationFailure as e:
+            print(f"❌ Could not create indexes on '{collection}': {e}")
+            if collection in REQUIRED_INDEXES:
+                failed.append(collection)
+    if failed:
+        raise IndexBuildError(f"Required indexes could not be built on {', '.join(failed)}; "
+                              f"remove the conflicting documents and restart")
+    return created
+
+def _plan_stages(plan: dict):
+    """Yield every stage name in an explain() plan tree"""
+    yield plan.get('stage')
+    if 'inputStage' in plan:
+        yield from _plan_stages(plan['inputStage'])
+    for child in plan.get('inputStages', []):
+        yield from _plan_stages(child)
+    # Slot-based engine wraps the classic plan under queryPlan
+    if 'queryPlan' in plan:
+        yield from _plan_stages(plan['queryPlan'])
+
+def check_query_plans(db=None) -> list:
+    """Explain every QUERY_SHAPES entry; returns the routes whose plan is a COLLSCAN"""
+    db = db if db is not None else get_database()
+    failures = []
+    for route, collection, query_filter, sort in QUERY_SHAPES:
+        find = {'find': collection, 'filter': query_filter}
+        if sort:
+            find['sort'] = dict(sort)
+        explain = db.command('explain', find, verbosity='queryPlanner')
+        winning = explain['queryPlanner']['winningPlan']
+        if 'COLLSCAN' in set(_plan_stages(winning)):
+            failures.append(route)
+    return failures
+
+indexes_cli = AppGroup('indexes', help='Manage MongoDB indexes.')
+
+@indexes_cli.command('apply')
+def apply_command():
+    """Create missing indexes."""
+    try:
+        created = ensure_indexes()
+    except IndexBuildError as e:
+        raise click.ClickException(str(e))
+    for collection, names in created.items():
+        click.echo(f"{collection}: {', '.join(names)}")
+
+@indexes_cli.command('check')
+def check_command():
+    """Fail if any route query shape would do a COLLSCAN."""
+    failures = check_query_plans()
+    for route in failures:
+        click.echo(f"COLLSCAN: {route}", err=True)
+    if failures:
+        raise SystemExit(1)
+    click.echo(f"All {len(QUERY_SHAPES)} query shapes use an index")
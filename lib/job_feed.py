@@ -0,0 +1,226 @@
+# lib/job_feed.py
+
+import asyncio
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo.errors import OperationFailure, PyMongoError
+from lib.mongodb import get_database
+from lib.pagination import keyset_filter, sync_watermark
+
+FEED_QUEUE_SIZE = int(os.getenv('FEED_QUEUE_SIZE', '100'))
+# Past this many changes a catch-up is slower than reloading the lists
+FEED_DELTA_LIMIT = int(os.getenv('FEED_DELTA_LIMIT', '500'))
+# How long the watcher waits on an idle change stream before rechecking subscribers
+WATCH_IDLE_MS = 1000
+# Change streams need a replica set; a standalone mongod answers with this code
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+WATCH_PIPELINE = [{'$match': {
+    'ns.coll': {'$in': ['bookings', 'service_requests']},
+    'operationType': {'$in': ['insert', 'update', 'replace']}
+}}]
+
+# Service request fields the feed renders
+REQUEST_FEED_PROJECTION = {'customerId': 1, 'customerName': 1, 'serviceId': 1, 'serviceName': 1,
+                           'status': 1, 'createdAt': 1, 'updatedAt': 1}
+
+def _changed_after(field: str, since: datetime, after_id) -> dict:
+    # Same-timestamp rows are told apart by _id once a feed event id gives us one
+    if after_id is None:
+        return {field: {'$gt': since}}
+    return keyset_filter(field, since, after_id, descending=False)
+
+def bookings_delta_query(user: dict, since: datetime, after_id=None) -> dict:
+    """Bookings of this user changed after (since, after_id) (provider_updated/customer_updated indexes)"""
+    owner = 'customer_id' if user['role'] == 'customer' else 'provider_id'
+    return {owner: ObjectId(user['user_id']), **_changed_after('updated_at', since, after_id)}
+
+def requests_delta_query(user: dict, since: datetime, after_id=None) -> dict:
+    """Service requests a user should see that changed after (since, after_id).
+
+    Providers see every request (any of them may pick it up); customers only
+    their own.
+    """
+    query = _changed_after('updatedAt', since, after_id)
+    if user['role'] == 'customer':
+        query['customerId'] = user['user_id']
+    return query
+
+def fetch_delta(user: dict, since: datetime, after_id=None, db=None, limit: int = FEED_DELTA_LIMIT) -> dict:
+    """Everything a user's job feed would have pushed after (since, after_id).
+
+    More than `limit` changes come back as empty lists with resync set: the
+    client reloads its lists instead and continues from the watermark.
+    """
+    db = db if db is not None else get_database()
+    watermark = sync_watermark()
+    bookings = list(db.bookings.find(bookings_delta_query(user, since, after_id))
+                    .sort([('updated_at', 1), ('_id', 1)]).limit(limit + 1))
+    requests = list(db.service_requests.find(requests_delta_query(user, since, after_id), REQUEST_FEED_PROJECTION)
+                    .sort([('updatedAt', 1), ('_id', 1)]).limit(limit + 1))
+    if len(bookings) + len(requests) > limit:
+        return {'bookings': [], 'service_requests': [], 'resync': True, 'watermark': watermark}
+    return {'bookings': bookings, 'service_requests': requests, 'resync': False, 'watermark': watermark}
+
+class Subscription:
+    """One SSE client's queue of feed events"""
+
+    def __init__(self, user: dict):
+        self.user_id = str(user['user_id'])
+        self.role = user['role']
+        self.events = queue.Queue(maxsize=FEED_QUEUE_SIZE)
+        # Set when events were dropped; the client must refetch to catch up
+        self.overflowed = False
+
+    def push(self, event):
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+class AsyncSubscription(Subscription):
+    """Subscription read on an event loop (the ASGI stream).
+
+    The watcher thread hands each event to the loop, so waiting for one
+    holds no thread.
+    """
+
+    def __init__(self, user: dict, loop):
+        super().__init__(user)
+        self._loop = loop
+        self.events = asyncio.Queue(maxsize=FEED_QUEUE_SIZE)
+
+    def push(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # loop closed; the stream is gone
+
+    def _put(self, event):
+        try:
+            self.events.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+class JobFeed:
+    """Fans out one change stream per process to every subscribed client.
+
+    The watcher thread starts with the first subscriber and exits once the
+    last one leaves. If the deployment has no change streams (standalone
+    mongod), `available` becomes False and clients fall back to polling
+    fetch_delta().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_user = {}
+        self._providers = set()
+        self._thread = None
+        self._resume_token = None
+        self.available = None
+
+    def subscribe(self, user: dict) -> Subscription:
+        return self._add(Subscription(user))
+
+    def subscribe_async(self, user: dict) -> AsyncSubscription:
+        """subscribe() for a coroutine; call from inside the running loop"""
+        return self._add(AsyncSubscription(user, asyncio.get_running_loop()))
+
+    def _add(self, sub: Subscription) -> Subscription:
+        with self._lock:
+            self._by_user.setdefault(sub.user_id, set()).add(sub)
+            if sub.role == 'provider':
+                self._providers.add(sub)
+            if self.available is not False and self._thread is None:
+                self._thread = threading.Thread(target=self._watch, name='job-feed', daemon=True)
+                self._thread.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._by_user.get(sub.user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_user[sub.user_id]
+            self._providers.discard(sub)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._by_user.values())
+
+    def _should_stop(self) -> bool:
+        # Checked and cleared under the lock so a concurrent subscribe()
+        # either sees this thread still running or starts a new one
+        with self._lock:
+            if self._by_user:
+                return False
+            self._thread = None
+            # Nobody heard what happened meanwhile; the next watcher starts from now
+            self._resume_token = None
+            return True
+
+    def _targets(self, collection: str, doc: dict) -> set:
+        with self._lock:
+            if collection == 'bookings':
+                targets = set()
+                for field in ('provider_id', 'customer_id'):
+                    targets |= self._by_user.get(str(doc.get(field)), set())
+                return targets
+            # service_requests: every provider, plus the customer who owns it
+            return set(self._providers) | self._by_user.get(str(doc.get('customerId')), set())
+
+    def _dispatch(self, change: dict):
+        doc = change.get('fullDocument')
+        if doc is None:
+            return
+        collection = change['ns']['coll']
+        if collection == 'service_requests':
+            doc = {key: value for key, value in doc.items()
+                   if key == '_id' or key in REQUEST_FEED_PROJECTION}
+        event = {
+            'type': 'booking' if collection == 'bookings' else 'service_request',
+            'op': change['operationType'],
+            'doc': doc
+        }
+        for sub in self._targets(collection, doc):
+            sub.push(event)
+
+    def _watch(self):
+        backoff = 1
+        while not self._should_stop():
+            try:
+                db = get_database()
+                with db.watch(WATCH_PIPELINE, full_document='updateLookup',
+                              resume_after=self._resume_token,
+                              max_await_time_ms=WATCH_IDLE_MS) as stream:
+                    self.available = True
+                    backoff = 1
+                    while stream.alive and self.subscriber_count() > 0:
+                        change = stream.try_next()
+                        if stream.resume_token is not None:
+                            self._resume_token = stream.resume_token
+                        if change is not None:
+                            self._dispatch(change)
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    print("⚠️ Change streams unavailable; job feed falls back to polling")
+                    with self._lock:
+                        self.available = False
+                        self._thread = None
+                    return
+                # e.g. resume token no longer in the oplog: start from now
+                print(f"Job feed watcher error: {e}")
+                self._resume_token = None
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            except PyMongoError as e:
+                print(f"Job feed watcher error: {e}")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+job_feed = JobFeed()
@@ -0,0 +1,78 @@
+# lib/json_provider.py
+
+import decimal
+import json
+import os
+from datetime import date, datetime, timezone
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional faster backend
+    orjson = None
+
+def _isoformat(value: datetime) -> str:
+    # pymongo returns naive datetimes that are already UTC
+    if value.tzinfo is None:
+        return value.isoformat() + 'Z'
+    return value.astimezone(timezone.utc).isoformat().replace('+00:00', 'Z')
+
+def encode_bson(value):
+    """Encode the BSON/Python types the standard json module can't handle"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return _isoformat(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return str(value.to_decimal())
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+USE_ORJSON = orjson is not None and os.getenv('JSON_BACKEND', 'orjson') == 'orjson'
+
+def dumps(obj) -> str:
+    """Compact JSON encoded like MongoJSONProvider, for use outside a Flask app"""
+    if USE_ORJSON:
+        return orjson.dumps(obj, default=encode_bson, option=MongoJSONProvider._orjson_options).decode('utf-8')
+    return json.dumps(obj, default=encode_bson, separators=(',', ':'))
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """App-wide JSON provider that encodes MongoDB documents as they come.
+
+    ObjectId becomes its hex string, datetime an ISO 8601 UTC string and
+    Decimal128 a decimal string, so routes can pass documents straight to
+    jsonify. Uses orjson when installed unless JSON_BACKEND=json.
+    """
+
+    # Keep document field order and skip the per-dump sort
+    sort_keys = False
+    use_orjson = USE_ORJSON
+
+    if orjson is not None:
+        _orjson_options = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs) -> str:
+        if self.use_orjson and not kwargs:
+            return orjson.dumps(obj, default=encode_bson, option=self._orjson_options).decode('utf-8')
+        kwargs.setdefault('default', encode_bson)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        if not self.use_orjson or pretty:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=encode_bson, option=self._orjson_options)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        if self.use_orjson and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
@@ -0,0 +1,241 @@
+# lib/metrics.py
+"""Per-route latency and MongoDB command metrics in Prometheus text format.
+
+RequestMetrics wraps the WSGI app so streamed responses are timed until
+their last chunk, and CommandMetrics (a pymongo CommandListener) charges
+every command to the request running on the same thread. Metrics are per
+process; each gunicorn worker reports its own.
+"""
+
+import os
+import threading
+import time
+from pymongo import monitoring
+
+# Seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Commands per request; a route whose count grows with its result size is an N+1
+DB_COMMAND_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+METRICS_PREFIX = os.getenv('METRICS_PREFIX', 'ayudabesh')
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Counter:
+    def __init__(self, name: str, help: str, labels=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                # [per-bucket counts..., count, sum]
+                series = self._series[labels] = [0] * len(self.buckets) + [0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', bound)])} {count}")
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', '+Inf')])} {series[-2]}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-2]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}")
+        return lines
+
+ROUTE_LABELS = ('blueprint', 'endpoint', 'method')
+
+http_requests = Counter(f'{METRICS_PREFIX}_http_requests_total', 'HTTP requests by route and status',
+                        ROUTE_LABELS + ('status',))
+http_latency = Histogram(f'{METRICS_PREFIX}_http_request_duration_seconds',
+                         'Time from request start to last byte sent', ROUTE_LABELS)
+http_db_commands = Histogram(f'{METRICS_PREFIX}_http_request_db_commands', 'MongoDB commands issued per request',
+                             ROUTE_LABELS, DB_COMMAND_BUCKETS)
+http_db_time = Histogram(f'{METRICS_PREFIX}_http_request_db_seconds', 'Time spent in MongoDB per request',
+                         ROUTE_LABELS)
+db_commands = Counter(f'{METRICS_PREFIX}_mongodb_commands_total', 'MongoDB commands by issuing endpoint',
+                      ('endpoint', 'command', 'outcome'))
+db_latency = Histogram(f'{METRICS_PREFIX}_mongodb_command_duration_seconds',
+                       'MongoDB command round-trip time by issuing endpoint',
+                       ('endpoint', 'command'), DB_LATENCY_BUCKETS)
+
+ALL_METRICS = (http_requests, http_latency, http_db_commands, http_db_time, db_commands, db_latency)
+
+class RequestStats:
+    """What one in-flight request has done so far"""
+
+    def __init__(self):
+        self.blueprint = ''
+        self.endpoint = 'unmatched'
+        self.commands = 0
+        self.db_seconds = 0.0
+
+_current = threading.local()
+
+def current_request_stats():
+    return getattr(_current, 'stats', None)
+
+class CommandMetrics(monitoring.CommandListener):
+    """Charges each MongoDB command to the request on the issuing thread.
+
+    Commands from background threads (job feed watcher, Motor) are
+    reported under endpoint="background".
+    """
+
+    def started(self, event):
+        pass
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        stats = current_request_stats()
+        endpoint = stats.endpoint if stats is not None else 'background'
+        if stats is not None:
+            stats.commands += 1
+            stats.db_seconds += seconds
+        db_commands.inc(endpoint, event.command_name, outcome)
+        db_latency.observe(seconds, endpoint, event.command_name)
+
+    def succeeded(self, event):
+        self._record(event, 'ok')
+
+    def failed(self, event):
+        self._record(event, 'error')
+
+command_metrics = CommandMetrics()
+
+class _TimedBody:
+    """Response iterable that records the request once the server closes it"""
+
+    def __init__(self, body, finish):
+        self._body = body
+        self._finish = finish
+
+    def __iter__(self):
+        return iter(self._body)
+
+    def close(self):
+        try:
+            if hasattr(self._body, 'close'):
+                self._body.close()
+        finally:
+            self._finish()
+
+class RequestMetrics:
+    """WSGI middleware timing each request through the end of its body"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        start = time.perf_counter()
+        stats = _current.stats = RequestStats()
+        status = ['500']
+
+        def capture_status(status_line, headers, exc_info=None):
+            status[0] = status_line.split(' ', 1)[0]
+            return start_response(status_line, headers, exc_info)
+
+        def finish():
+            _current.stats = None
+            labels = (stats.blueprint, stats.endpoint, environ.get('REQUEST_METHOD', ''))
+            http_requests.inc(*labels, status[0])
+            http_latency.observe(time.perf_counter() - start, *labels)
+            http_db_commands.observe(stats.commands, *labels)
+            http_db_time.observe(stats.db_seconds, *labels)
+
+        try:
+            body = self.wsgi_app(environ, capture_status)
+        except Exception:
+            finish()
+            raise
+        return _TimedBody(body, finish)
+
+async def observe_asgi(asgi_app, scope, receive, send, blueprint: str, endpoint: str):
+    """Run an ASGI request (asgi.py's async routes) and record it like RequestMetrics.
+
+    Motor runs commands on its own threads, so they can't be charged to the
+    request: they count under endpoint="background" and the per-request
+    db histograms are not observed for these routes.
+    """
+    start = time.perf_counter()
+    labels = (blueprint, endpoint, scope.get('method', ''))
+    status = ['500']
+    finished = [False]
+
+    def finish():
+        if not finished[0]:
+            finished[0] = True
+            http_requests.inc(*labels, status[0])
+            http_latency.observe(time.perf_counter() - start, *labels)
+
+    async def timed_send(message):
+        if message['type'] == 'http.response.start':
+            status[0] = str(message['status'])
+        await send(message)
+        if message['type'] == 'http.response.body' and not message.get('more_body', False):
+            finish()
+
+    try:
+        await asgi_app(scope, receive, timed_send)
+    finally:
+        finish()
+
+def init_metrics(app):
+    """Install the request middleware and label requests by Flask endpoint"""
+    from flask import request
+
+    @app.before_request
+    def label_request():
+        stats = current_request_stats()
+        if stats is not None and request.endpoint:
+            stats.blueprint = request.blueprint or ''
+            stats.endpoint = request.endpoint
+
+    app.wsgi_app = RequestMetrics(app.wsgi_app)
+
+def render_metrics(gauges: dict = None) -> str:
+    """Prometheus text exposition of every metric plus numeric gauges.
+
+    gauges is {group: {name: value}}, rendered as <prefix>_<group>_<name>.
+    """
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    for group, values in (gauges or {}).items():
+        for name, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            metric = f"{METRICS_PREFIX}_{group}_{name}"
+            lines.extend([f"# TYPE {metric} gauge", f"{metric} {value}"])
+    return '\n'.join(lines) + '\n'
@@ -1,39 +1,196 @@
 # lib/mongodb.py
 
-from pymongo import MongoClient
+import pymongo
+from pymongo import MongoClient, ReadPreference, monitoring
 from flask import Flask
 import os
+import threading
+import time
+from lib.metrics import command_metrics
 
 db = None
+reports_db = None
+_client = None
+_client_pid = None
+_settings = None
+_connect_lock = threading.Lock()
+
+READ_PREFERENCES = {
+    'primary': ReadPreference.PRIMARY,
+    'primaryPreferred': ReadPreference.PRIMARY_PREFERRED,
+    'secondary': ReadPreference.SECONDARY,
+    'secondaryPreferred': ReadPreference.SECONDARY_PREFERRED,
+    'nearest': ReadPreference.NEAREST,
+}
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters collected from pymongo's CMAP events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.pools = 0
+        self.connections_open = 0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def _bump(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def pool_created(self, event):
+        self._bump(pools=1)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._bump(pool_clears=1)
+
+    def pool_closed(self, event):
+        self._bump(pools=-1)
+
+    def connection_created(self, event):
+        self._bump(connections_open=1, connections_created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._bump(connections_open=-1, connections_closed=1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._bump(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._bump(checked_out=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._bump(checked_out=-1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'pools': self.pools,
+                'connections_open': self.connections_open,
+                'connections_created': self.connections_created,
+                'connections_closed': self.connections_closed,
+                'checked_out': self.checked_out,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'pool_clears': self.pool_clears
+            }
+
+pool_metrics = PoolMetrics()
+
+def read_settings(app: Flask) -> dict:
+    """Connection settings from app.config (see config.Config), falling back to the environment"""
+    config = app.config if app is not None else {}
+
+    def setting(name, default=None):
+        value = config.get(name)
+        return value if value is not None else os.getenv(name, default)
+
+    uri = setting('MONGODB_URI')
+    if not uri:
+        raise ValueError("MONGODB_URI is not set in environment variables")
+
+    compressors = setting('MONGODB_COMPRESSORS', '')
+    return {
+        'uri': uri,
+        'db_name': setting('MONGODB_DB_NAME', 'ayudabesh'),
+        'read_preference': setting('MONGODB_READ_PREFERENCE', 'primary'),
+        'reports_read_preference': setting('MONGODB_REPORTS_READ_PREFERENCE', 'secondaryPreferred'),
+        'ping_on_startup': str(setting('MONGODB_PING_ON_STARTUP', 'false')).lower() == 'true',
+        'client_options': {
+            'maxPoolSize': int(setting('MONGODB_MAX_POOL_SIZE', 100)),
+            'minPoolSize': int(setting('MONGODB_MIN_POOL_SIZE', 0)),
+            'waitQueueTimeoutMS': int(setting('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 2000)),
+            'serverSelectionTimeoutMS': int(setting('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+            'connectTimeoutMS': int(setting('MONGODB_CONNECT_TIMEOUT_MS', 5000)),
+            'socketTimeoutMS': int(setting('MONGODB_SOCKET_TIMEOUT_MS', 30000)),
+            'compressors': [c.strip() for c in compressors.split(',') if c.strip()] or None,
+        }
+    }
+
+def _connect():
+    """Create this process's client; no sockets are opened until first use"""
+    global db, reports_db, _client, _client_pid
+    options = {k: v for k, v in _settings['client_options'].items() if v is not None}
+    _client = MongoClient(
+        _settings['uri'],
+        connect=False,
+        event_listeners=[pool_metrics, command_metrics],
+        read_preference=READ_PREFERENCES[_settings['read_preference']],
+        **options
+    )
+    _client_pid = os.getpid()
+    db = _client[_settings['db_name']]
+    reports_db = _client.get_database(
+        _settings['db_name'],
+        read_preference=READ_PREFERENCES[_settings['reports_read_preference']]
+    )
 
 def init_db(app: Flask):
     """Initialize MongoDB connection"""
-    global db
-    
+    global _settings
+
     try:
-        uri = os.getenv('MONGODB_URI')
-        
-        if not uri:
-            raise ValueError("MONGODB_URI is not set in environment variables")
-        
-        # Ensure the URI ends with /ayudabesh
-        if not uri.endswith('/ayudabesh'):
-            if uri.endswith('/'):
-                uri = uri + 'ayudabesh'
-            else:
-                uri = uri + '/ayudabesh'
-        
-        client = MongoClient(uri)
-        db = client['ayudabesh']
-        client.admin.command('ping')
-        print("✅ Successfully connected to MongoDB database: ayudabesh")
-        
+        _settings = read_settings(app)
+        _connect()
+        if _settings['ping_on_startup']:
+            _client.admin.command('ping')
+        print(f"✅ MongoDB client ready for database: {_settings['db_name']}")
+
     except Exception as e:
         print(f"❌ Error connecting to MongoDB: {e}")
         raise
 
+def close_db():
+    """Close this process's client (used on worker shutdown)"""
+    global _client, _client_pid
+    if _client is not None:
+        _client.close()
+    _client, _client_pid = None, None
+
+def _ensure_process_client():
+    # A client inherited across fork() must not be reused; build a new one
+    if _settings is not None and _client_pid != os.getpid():
+        with _connect_lock:
+            if _client_pid != os.getpid():
+                pool_metrics.reset()
+                _connect()
+
 def get_database():
     """Returns the MongoDB database instance"""
+    _ensure_process_client()
     if db is None:
         raise RuntimeError("Database not initialized. Call init_db(app) first in your app startup.")
-    return db
\ No newline at end of file
+    return db
+
+def get_reports_database():
+    """Database handle for read-heavy admin reports (secondary-preferred by default)"""
+    _ensure_process_client()
+    if reports_db is None:
+        return get_database()
+    return reports_db
+
+def ping(timeout: float) -> float:
+    """Round-trip a ping through the pool within timeout seconds; returns the latency"""
+    _ensure_process_client()
+    if _client is None:
+        raise RuntimeError("Database not initialized. Call init_db(app) first in your app startup.")
+    start = time.perf_counter()
+    with pymongo.timeout(timeout):
+        _client.admin.command('ping')
+    return time.perf_counter() - start
@@ -0,0 +1,47 @@
+# lib/motor_db.py
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from lib.mongodb import READ_PREFERENCES, pool_metrics, read_settings
+from lib.metrics import command_metrics
+
+motor_db = None
+motor_reports_db = None
+_motor_client = None
+
+def init_motor(app):
+    """Create the Motor client for the async API from the same settings as init_db.
+
+    Call from inside the serving event loop (e.g. Quart's before_serving).
+    """
+    global motor_db, motor_reports_db, _motor_client
+    settings = read_settings(app)
+    options = {k: v for k, v in settings['client_options'].items() if v is not None}
+    _motor_client = AsyncIOMotorClient(
+        settings['uri'],
+        event_listeners=[pool_metrics, command_metrics],
+        read_preference=READ_PREFERENCES[settings['read_preference']],
+        **options
+    )
+    motor_db = _motor_client[settings['db_name']]
+    motor_reports_db = _motor_client.get_database(
+        settings['db_name'],
+        read_preference=READ_PREFERENCES[settings['reports_read_preference']]
+    )
+
+def close_motor():
+    global motor_db, motor_reports_db, _motor_client
+    if _motor_client is not None:
+        _motor_client.close()
+    motor_db, motor_reports_db, _motor_client = None, None, None
+
+def get_motor_database():
+    """Returns the Motor database instance"""
+    if motor_db is None:
+        raise RuntimeError("Motor not initialized. Call init_motor(app) when the event loop starts.")
+    return motor_db
+
+def get_motor_reports_database():
+    """Motor handle for admin reports (secondary-preferred by default)"""
+    if motor_reports_db is None:
+        return get_motor_database()
+    return motor_reports_db
@@ -0,0 +1,99 @@
+# lib/page_cache.py
+"""In-memory cache of rendered frontend pages.
+
+The frontend templates take no per-user context (data is fetched client
+side from the API), so a page renders to the same bytes for every visitor
+of the same path. Each (template, path) is rendered once per process,
+tagged with an ETag, and compressed at most once per content coding; the
+Compression middleware passes these responses through untouched.
+
+Disabled while templates auto-reload (debug), and emptied by clear().
+"""
+
+import hashlib
+import threading
+from flask import current_app, render_template, request
+from lib.compression import compress, negotiate
+
+class _Page:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.encoded = {}
+
+class PageCache:
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _page(self, template: str) -> _Page:
+        key = (template, request.path)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None:
+                self.hits += 1
+                return page
+        page = _Page(render_template(template).encode('utf-8'))
+        with self._lock:
+            self.misses += 1
+            # Another thread may have rendered it meanwhile; keep the first
+            return self._pages.setdefault(key, page)
+
+    def _encoded(self, page: _Page, encoding: str) -> bytes:
+        data = page.encoded.get(encoding)
+        if data is None:
+            data = page.encoded[encoding] = compress(page.body, encoding)
+        return data
+
+    def render(self, template: str, private: bool = False):
+        """Cached render_template() response, 304 when the client's copy is current.
+
+        private -- the route is behind login, so shared caches must not keep it
+        """
+        app = current_app
+        if app.jinja_env.auto_reload:
+            return render_template(template)
+
+        page = self._page(template)
+        response = app.response_class(mimetype='text/html')
+        # Weak: the identity, gzip and br bodies share one tag
+        response.set_etag(page.etag, weak=True)
+        # Browsers revalidate every time; an unchanged page costs a 304
+        response.cache_control.no_cache = True
+        if private:
+            response.cache_control.private = True
+        else:
+            response.cache_control.public = True
+        response.vary.add('Accept-Encoding')
+
+        if request.if_none_match.contains_weak(page.etag):
+            response.status_code = 304
+            return response
+
+        encoding = negotiate(request.headers.get('Accept-Encoding', ''))
+        if encoding:
+            response.set_data(self._encoded(page, encoding))
+            response.content_encoding = encoding
+        else:
+            response.set_data(page.body)
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._pages = {}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'pages': len(self._pages), 'hits': self.hits, 'misses': self.misses}
+
+page_cache = PageCache()
+
+def render_page(template: str):
+    """render_template() for pages that don't depend on who is asking"""
+    return page_cache.render(template)
+
+def render_private_page(template: str):
+    """render_page() for routes behind token_required"""
+    return page_cache.render(template, private=True)
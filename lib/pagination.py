@@ -0,0 +1,72 @@
+# lib/pagination.py
+
+import base64
+import os
+from datetime import datetime, timedelta, timezone
+from bson import json_util
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# Seconds a sync watermark is held back so a write stamped just before it,
+# but committed just after, is still returned by the next delta call
+SYNC_WATERMARK_LAG = float(os.getenv('SYNC_WATERMARK_LAG', '2'))
+
+def parse_limit(value, default: int = DEFAULT_LIMIT, maximum: int = MAX_LIMIT) -> int:
+    """Parse a ?limit= query value, clamped to [1, maximum]"""
+    if value is None or value == '':
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, maximum))
+
+def encode_cursor(*values) -> str:
+    """Encode the sort key of the last returned row as an opaque cursor"""
+    raw = json_util.dumps(list(values)).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> list:
+    """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list):
+        raise ValueError('Invalid cursor')
+    return values
+
+def keyset_filter(field: str, value, last_id, descending: bool = True) -> dict:
+    """Match rows that sort strictly after (value, last_id) on (field, _id)"""
+    op = '$lt' if descending else '$gt'
+    branches = [{field: value, '_id': {op: last_id}}]
+    if value is None:
+        # Missing/null sorts before every value; ascending order continues into them
+        if not descending:
+            branches.append({field: {'$ne': None}})
+    else:
+        branches.append({field: {op: value}})
+        if descending:
+            branches.append({field: None})
+    return {'$or': branches}
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a ?since=/?updated_since= value: ISO 8601 or epoch milliseconds, as naive UTC"""
+    try:
+        if value.isdigit():
+            return datetime.utcfromtimestamp(int(value) / 1000)
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, OverflowError, OSError):
+        raise ValueError('Invalid timestamp; use ISO 8601 or epoch milliseconds')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def sync_watermark() -> datetime:
+    """The ?since= value a client should send next; take it before querying.
+
+    Deltas overlap by SYNC_WATERMARK_LAG seconds, so clients must apply rows
+    idempotently (by _id).
+    """
+    return datetime.utcnow() - timedelta(seconds=SYNC_WATERMARK_LAG)
@@ -0,0 +1,155 @@
+# lib/password_pool.py
+"""Runs the password KDF in a small process pool so a burst of logins can't
+occupy every request thread, and sheds new work once the queue is full.
+
+Only werkzeug is imported here: pool workers are spawned and import this
+module, nothing else from the app."""
+
+import functools
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# werkzeug method, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000".
+# Omitted parameters take werkzeug's defaults. Hashes made with anything
+# else are upgraded on the next successful login.
+PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+# KDF processes per web worker; 0 hashes inline on the request thread
+PASSWORD_POOL_WORKERS = int(os.getenv('PASSWORD_POOL_WORKERS', '2'))
+# Jobs allowed to wait for a free KDF process before requests get a 503
+PASSWORD_POOL_QUEUE = int(os.getenv('PASSWORD_POOL_QUEUE', '16'))
+PASSWORD_POOL_TIMEOUT = float(os.getenv('PASSWORD_POOL_TIMEOUT', '10'))
+
+class PasswordPoolBusy(Exception):
+    """The KDF queue is full or a job timed out; answer 503 and let the client retry"""
+
+def _hash(password: str, method: str) -> str:
+    return generate_password_hash(password, method=method)
+
+def _check(hashed_password: str, password: str) -> bool:
+    return check_password_hash(hashed_password, password)
+
+class PasswordPool:
+    """Bounded ProcessPoolExecutor for _hash/_check, created lazily per process"""
+
+    def __init__(self, workers: int = PASSWORD_POOL_WORKERS, queue_depth: int = PASSWORD_POOL_QUEUE,
+                 timeout: float = PASSWORD_POOL_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(workers + queue_depth) if workers else None
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.completed = 0
+        self.shed = 0
+        self.timeouts = 0
+        self.in_flight = 0
+
+    def _bump(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # A pool inherited across fork() has no live processes; build our own.
+        # spawn, not fork: forking a threaded web worker is unsafe.
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context('spawn'))
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _release(self, future):
+        self._slots.release()
+        self._bump(in_flight=-1, completed=1 if future is not None else 0)
+
+    def run(self, fn, *args):
+        """Run fn(*args) in the pool; raises PasswordPoolBusy instead of queueing unboundedly"""
+        if not self.workers:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            self._bump(shed=1)
+            raise PasswordPoolBusy()
+        self._bump(in_flight=1)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(None)
+            self._discard_executor()
+            raise
+        # The slot is held until the job finishes, even if we stop waiting for it
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            self._bump(timeouts=1)
+            raise PasswordPoolBusy()
+        except BrokenProcessPool:
+            self._discard_executor()
+            raise
+
+    def _discard_executor(self):
+        # A KDF process died (e.g. OOM-killed); start a fresh pool next time
+        with self._lock:
+            self._executor, self._pid = None, None
+
+    def hash(self, password: str, method: str = PASSWORD_HASH_METHOD) -> str:
+        return self.run(_hash, password, method)
+
+    def check(self, hashed_password: str, password: str) -> bool:
+        return self.run(_check, hashed_password, password)
+
+    def hash_many(self, passwords: list, method: str = PASSWORD_HASH_METHOD) -> list:
+        """Hash a batch on every pool process at once (bulk imports).
+
+        Not subject to queue shedding; logins in this worker may get 503s
+        while a large batch runs.
+        """
+        if not self.workers:
+            return [_hash(password, method) for password in passwords]
+        chunksize = max(1, len(passwords) // (self.workers * 4))
+        try:
+            return list(self._get_executor().map(_hash, passwords, itertools.repeat(method),
+                                                 chunksize=chunksize))
+        except BrokenProcessPool:
+            self._discard_executor()
+            raise
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'in_flight': self.in_flight,
+                'completed': self.completed,
+                'shed': self.shed,
+                'timeouts': self.timeouts
+            }
+
+    def shutdown(self):
+        """Stop this process's KDF workers (used on web worker shutdown)"""
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor, self._pid = None, None
+
+@functools.lru_cache(maxsize=None)
+def method_prefix(method: str) -> str:
+    """The prefix werkzeug stores for a method, with every default parameter filled in.
+
+    "scrypt" becomes "scrypt:32768:8:1" on current werkzeug. Found by hashing
+    once, so it follows whatever defaults the installed version has; that
+    hash is a full KDF run, so create_app() warms it before workers fork.
+    """
+    return generate_password_hash('', method=method).split('$', 1)[0]
+
+def needs_rehash(hashed_password: str, method: str = PASSWORD_HASH_METHOD) -> bool:
+    """True if a stored hash was made with other KDF parameters than the configured ones"""
+    return hashed_password.split('$', 1)[0] != method_prefix(method)
+
+password_pool = PasswordPool()
@@ -0,0 +1,148 @@
+# lib/rate_limit.py
+
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from lib.cache import TTLCache
+from lib.mongodb import get_database
+
+# "memory" keeps buckets per process; "mongo" shares them across workers
+RATE_LIMIT_STORE = os.getenv('RATE_LIMIT_STORE', 'memory')
+# Use the client address from X-Forwarded-For (only behind a trusted proxy)
+RATE_LIMIT_TRUST_FORWARDED = os.getenv('RATE_LIMIT_TRUST_FORWARDED', 'false').lower() == 'true'
+
+# Burst size and sustained attempts per minute
+LOGIN_IP_BURST = int(os.getenv('LOGIN_IP_BURST', '20'))
+LOGIN_IP_PER_MINUTE = float(os.getenv('LOGIN_IP_PER_MINUTE', '10'))
+LOGIN_USER_BURST = int(os.getenv('LOGIN_USER_BURST', '5'))
+LOGIN_USER_PER_MINUTE = float(os.getenv('LOGIN_USER_PER_MINUTE', '1'))
+
+class MemoryStore:
+    """Token buckets held in this process; also the stand-in for a shared store.
+
+    A bucket is forgotten once it would have refilled, which bounds memory to
+    the keys seen recently.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        self._buckets = TTLCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, rate: float):
+        """Spend one token; returns (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + (now - last) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets.set(key, (tokens, now), ttl=(capacity - tokens) / rate)
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+    def reset(self, key: str):
+        self._buckets.delete(key)
+
+class MongoStore:
+    """Token buckets in db.rate_limits, shared by every worker.
+
+    Each take() is one atomic pipeline update; the rate_limits TTL index
+    removes buckets once they would have refilled.
+    """
+
+    def __init__(self, collection: str = 'rate_limits'):
+        self.collection = collection
+
+    def take(self, key: str, capacity: int, rate: float):
+        now = datetime.utcnow()
+        elapsed = {'$divide': [{'$subtract': [now, {'$ifNull': ['$ts', now]}]}, 1000]}
+        bucket = get_database()[self.collection].find_one_and_update(
+            {'_id': key},
+            [
+                {'$set': {'tokens': {'$min': [
+                    capacity,
+                    {'$add': [{'$ifNull': ['$tokens', capacity]}, {'$multiply': [elapsed, rate]}]}
+                ]}}},
+                {'$set': {'allowed': {'$gte': ['$tokens', 1]}}},
+                {'$set': {
+                    'tokens': {'$cond': ['$allowed', {'$subtract': ['$tokens', 1]}, '$tokens']},
+                    'ts': now
+                }},
+                {'$set': {'expires_at': {'$add': [now, {'$multiply': [
+                    {'$divide': [{'$subtract': [capacity, '$tokens']}, rate]}, 1000]}]}}}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if bucket['allowed']:
+            return True, 0
+        return False, (1 - bucket['tokens']) / rate
+
+    def reset(self, key: str):
+        get_database()[self.collection].delete_one({'_id': key})
+
+class LoginLimiter:
+    """Per-IP and per-username token buckets checked before any login work"""
+
+    def __init__(self, store=None):
+        self.store = store if store is not None else (MongoStore() if RATE_LIMIT_STORE == 'mongo' else MemoryStore())
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected_ip = 0
+        self.rejected_username = 0
+        self.store_errors = 0
+
+    def _bump(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _take(self, key: str, capacity: int, per_minute: float):
+        try:
+            return self.store.take(key, capacity, per_minute / 60)
+        except PyMongoError as e:
+            # Fail open: a store outage must not lock everyone out
+            print(f"⚠️ Rate limit store error: {e}")
+            self._bump('store_errors')
+            return True, 0
+
+    def check(self, ip: str, username: str):
+        """Returns None if the attempt may proceed, else seconds until it may be retried"""
+        allowed, retry_after = self._take(f"login:ip:{ip}", LOGIN_IP_BURST, LOGIN_IP_PER_MINUTE)
+        if not allowed:
+            self._bump('rejected_ip')
+            return max(1, math.ceil(retry_after))
+        allowed, retry_after = self._take(f"login:user:{str(username).lower()}",
+                                          LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE)
+        if not allowed:
+            self._bump('rejected_username')
+            return max(1, math.ceil(retry_after))
+        self._bump('allowed')
+        return None
+
+    def succeeded(self, username: str):
+        """A correct password refills the username's bucket"""
+        try:
+            self.store.reset(f"login:user:{str(username).lower()}")
+        except PyMongoError as e:
+            print(f"⚠️ Rate limit store error: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'store': type(self.store).__name__,
+                'allowed': self.allowed,
+                'rejected_ip': self.rejected_ip,
+                'rejected_username': self.rejected_username,
+                'store_errors': self.store_errors
+            }
+
+def client_ip(req) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED and req.access_route:
+        return req.access_route[0]
+    return req.remote_addr or 'unknown'
+
+login_limiter = LoginLimiter()
@@ -0,0 +1,135 @@
+# lib/rollups.py
+
+import click
+from flask.cli import AppGroup
+from pymongo import UpdateOne
+from lib.mongodb import get_database
+
+# Per-provider counters live on the provider's user document:
+#   stats.completed_jobs, stats.rating_sum, stats.rating_count,
+#   stats.accepted_jobs, stats.accept_latency_sum (seconds)
+# plus a top-level rating_avg that /api/providers filters and sorts on.
+STATS_FIELDS = ('completed_jobs', 'rating_sum', 'rating_count', 'accepted_jobs', 'accept_latency_sum')
+
+def _rating_avg(sum_expr, count_expr):
+    return {'$cond': [
+        {'$gt': [count_expr, 0]},
+        {'$round': [{'$divide': [sum_expr, count_expr]}, 2]},
+        None
+    ]}
+
+def record_accepted(provider_id, latency_seconds: float, db=None):
+    """Count an accepted booking and how long it waited for the provider"""
+    record_accepted_many(provider_id, [latency_seconds], db)
+
+def record_accepted_many(provider_id, latencies: list, db=None):
+    """record_accepted() for several bookings of one provider in one write"""
+    db = db if db is not None else get_database()
+    db.users.update_one(
+        {'_id': provider_id},
+        {'$inc': {
+            'stats.accepted_jobs': len(latencies),
+            'stats.accept_latency_sum': sum(max(latency, 0) for latency in latencies)
+        }}
+    )
+
+def _completed_update(jobs: int, rating_sum: float, rating_count: int) -> list:
+    # A pipeline update so the counters and the derived rating_avg change in
+    # one atomic write to the provider document
+    return [
+        {'$set': {
+            'stats.completed_jobs': {'$add': [{'$ifNull': ['$stats.completed_jobs', 0]}, jobs]},
+            'stats.rating_sum': {'$add': [{'$ifNull': ['$stats.rating_sum', 0]}, rating_sum]},
+            'stats.rating_count': {'$add': [{'$ifNull': ['$stats.rating_count', 0]}, rating_count]}
+        }},
+        {'$set': {'rating_avg': _rating_avg('$stats.rating_sum', '$stats.rating_count')}}
+    ]
+
+def record_completed(provider_id, rating=None, db=None):
+    """Count a completed booking and fold its rating into rating_avg"""
+    db = db if db is not None else get_database()
+    rated = rating is not None
+    db.users.update_one({'_id': provider_id},
+                        _completed_update(1, rating if rated else 0, 1 if rated else 0))
+
+def record_completed_many(completions: list, db=None):
+    """record_completed() for (provider_id, rating or None) pairs, one write per provider"""
+    db = db if db is not None else get_database()
+    totals = {}
+    for provider_id, rating in completions:
+        jobs, rating_sum, rating_count = totals.get(provider_id, (0, 0, 0))
+        if rating is not None:
+            rating_sum, rating_count = rating_sum + rating, rating_count + 1
+        totals[provider_id] = (jobs + 1, rating_sum, rating_count)
+    ops = [UpdateOne({'_id': provider_id}, _completed_update(*counts))
+           for provider_id, counts in totals.items()]
+    if ops:
+        db.users.bulk_write(ops, ordered=False)
+
+def compute_rollups(db=None) -> dict:
+    """Recompute every provider's stats from bookings: {provider_id: stats}"""
+    db = db if db is not None else get_database()
+    pipeline = [
+        {'$match': {'status': {'$in': ['accepted', 'completed']}}},
+        {'$group': {
+            '_id': '$provider_id',
+            'completed_jobs': {'$sum': {'$cond': [{'$eq': ['$status', 'completed']}, 1, 0]}},
+            'rating_sum': {'$sum': {'$cond': [
+                {'$and': [{'$eq': ['$status', 'completed']}, {'$isNumber': '$rating'}]}, '$rating', 0]}},
+            'rating_count': {'$sum': {'$cond': [
+                {'$and': [{'$eq': ['$status', 'completed']}, {'$isNumber': '$rating'}]}, 1, 0]}},
+            'accepted_jobs': {'$sum': {'$cond': [{'$ifNull': ['$accepted_at', False]}, 1, 0]}},
+            'accept_latency_sum': {'$sum': {'$cond': [
+                {'$ifNull': ['$accepted_at', False]},
+                {'$max': [{'$divide': [{'$subtract': ['$accepted_at', '$created_at']}, 1000]}, 0]},
+                0
+            ]}}
+        }}
+    ]
+    rollups = {}
+    for row in db.bookings.aggregate(pipeline, allowDiskUse=True):
+        provider_id = row.pop('_id')
+        rollups[provider_id] = row
+    return rollups
+
+def rebuild_rollups(fix: bool = True, db=None) -> list:
+    """Compare stored provider stats with a fresh recomputation.
+
+    Returns the ids of providers whose stored stats drifted; with fix=True
+    their stats and rating_avg are overwritten with the recomputed values.
+    """
+    db = db if db is not None else get_database()
+    expected = compute_rollups(db)
+    empty = {field: 0 for field in STATS_FIELDS}
+
+    drifted, ops = [], []
+    for provider in db.users.find({'role': 'provider'}, {'stats': 1, 'rating_avg': 1}):
+        want = {**empty, **expected.get(provider['_id'], {})}
+        have = {**empty, **(provider.get('stats') or {})}
+        want_avg = round(want['rating_sum'] / want['rating_count'], 2) if want['rating_count'] else None
+        same = all(abs(have[f] - want[f]) < 1e-6 for f in STATS_FIELDS) and provider.get('rating_avg') == want_avg
+        if same:
+            continue
+        drifted.append(provider['_id'])
+        if fix:
+            ops.append(UpdateOne({'_id': provider['_id']},
+                                 {'$set': {'stats': want, 'rating_avg': want_avg}}))
+        if len(ops) >= 1000:
+            db.users.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        db.users.bulk_write(ops, ordered=False)
+    return drifted
+
+rollups_cli = AppGroup('rollups', help='Maintain per-provider booking rollups.')
+
+@rollups_cli.command('rebuild')
+@click.option('--check', is_flag=True, help='Only report drift; exit non-zero if any.')
+def rebuild_command(check):
+    """Recompute provider stats from bookings."""
+    drifted = rebuild_rollups(fix=not check)
+    for provider_id in drifted:
+        click.echo(f"drift: {provider_id}", err=check)
+    if check and drifted:
+        raise SystemExit(1)
+    click.echo(f"{len(drifted)} provider(s) {'drifted' if check else 'rebuilt'}")
@@ -0,0 +1,119 @@
+# lib/streaming.py
+
+import itertools
+import os
+from flask import Response, current_app, request, stream_with_context
+
+# Documents fetched per getMore and written per chunk
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', '500'))
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+# Written when a stream fails after the 200 went out. Not valid JSON or an
+# NDJSON line, so a client can't take the cut-off body for a complete one;
+# the error is then re-raised so the server also drops the connection.
+STREAM_ABORTED = '\n!stream aborted: response is incomplete\n'
+
+_NOTHING = object()
+
+def ndjson_requested(args, accept_mimetypes) -> bool:
+    """True if the query string or Accept header asks for newline-delimited JSON"""
+    if args.get('format') == 'ndjson':
+        return True
+    # Only an explicit Accept entry counts; browsers send */* for fetch()
+    return any(mimetype == NDJSON_MIMETYPE and quality > 0
+               for mimetype, quality in accept_mimetypes)
+
+def wants_ndjson() -> bool:
+    """True if the current client asked for newline-delimited JSON"""
+    return ndjson_requested(request.args, request.accept_mimetypes)
+
+class JSONChunker:
+    """Incremental JSON array / NDJSON encoder shared by the sync and async
+    streaming responses. Feed documents to add(); it returns a chunk of text
+    whenever batch_size documents have accumulated."""
+
+    def __init__(self, dumps, ndjson: bool, key: str = None, tail=None,
+                 transform=None, batch_size: int = STREAM_BATCH_SIZE):
+        self.dumps = dumps
+        self.ndjson = ndjson
+        self.key = key
+        self.tail = tail
+        self.transform = transform
+        self.batch_size = batch_size
+        self.last = None
+        self.count = 0
+        self._chunk = []
+
+    @property
+    def mimetype(self) -> str:
+        return NDJSON_MIMETYPE if self.ndjson else 'application/json'
+
+    def open(self) -> str:
+        if self.ndjson:
+            return ''
+        return '{"%s":[' % self.key if self.key else '['
+
+    def add(self, doc):
+        encoded = self.dumps(self.transform(doc) if self.transform is not None else doc)
+        if self.ndjson:
+            self._chunk.append(encoded + '\n')
+        else:
+            self._chunk.append(encoded if self.count == 0 else ',' + encoded)
+        self.last, self.count = doc, self.count + 1
+        if len(self._chunk) >= self.batch_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> str:
+        chunk, self._chunk = ''.join(self._chunk), []
+        return chunk
+
+    def close(self) -> str:
+        rest = self.flush()
+        extra = self.tail(self.last, self.count) if self.tail is not None else None
+        dumps = self.dumps
+        if self.ndjson:
+            return rest + (dumps(extra) + '\n' if extra else '')
+        if self.key:
+            trailer = ''.join(',%s:%s' % (dumps(k), dumps(v)) for k, v in (extra or {}).items())
+            return rest + ']' + trailer + '}'
+        return rest + ']'
+
+def stream_json(docs, transform=None, key: str = None, tail=None,
+                batch_size: int = STREAM_BATCH_SIZE, status: int = 200) -> Response:
+    """Stream a pymongo cursor (or any iterable) as a JSON array or NDJSON.
+
+    Only one batch of documents is held in memory at a time. The first
+    batch is fetched before returning; a failure after that ends the body
+    with STREAM_ABORTED.
+
+    transform -- optional function applied to each document before encoding
+    key       -- wrap the array in an object under this key, e.g. {"bookings": [...]}
+    tail      -- optional function (last_doc, count) -> dict of extra fields
+                 written after the array (with key) or as a final NDJSON line;
+                 last_doc is the document as read, before transform
+    """
+    if hasattr(docs, 'batch_size'):
+        docs = docs.batch_size(batch_size)
+    chunker = JSONChunker(current_app.json.dumps, wants_ndjson(), key, tail, transform, batch_size)
+    # Run the query and fetch the first batch now, so connection and query
+    # errors raise in the view (and become its error response), not mid-body
+    docs = iter(docs)
+    first = next(docs, _NOTHING)
+
+    def generate():
+        try:
+            yield chunker.open()
+            if first is not _NOTHING:
+                for doc in itertools.chain([first], docs):
+                    chunk = chunker.add(doc)
+                    if chunk:
+                        yield chunk
+            yield chunker.close()
+        except Exception as e:
+            print(f"❌ Stream aborted: {e}")
+            yield STREAM_ABORTED
+            raise
+
+    return Response(stream_with_context(generate()), status=status, mimetype=chunker.mimetype)
@@ -1,13 +1,22 @@
 # routes/admin.py
 from flask import Blueprint, request, jsonify
-from lib.mongodb import get_database
-from lib.decorators import admin_required
+from lib.mongodb import get_database, get_reports_database, pool_metrics
+from lib.decorators import token_required, admin_required
+from lib.auth import invalidate_user, user_cache, token_cache
+from lib.catalogue import service_catalogue
+from lib.password_pool import password_pool
+from lib.rate_limit import login_limiter
+from lib.accounts import import_users, IMPORT_ROLES
+from lib.page_cache import page_cache
+from lib.streaming import stream_json
+from lib.pagination import DEFAULT_LIMIT, parse_limit, encode_cursor, decode_cursor, keyset_filter
 from datetime import datetime, timedelta
 from bson.objectid import ObjectId
 
 admin_bp = Blueprint('admin', __name__)
 
 @admin_bp.route('/verify-provider/<provider_id>', methods=['POST'])
+@token_required
 @admin_required
 def verify_provider(provider_id):
     """Admin verifies a provider"""
@@ -16,12 +25,85 @@ def verify_provider(provider_id):
         {'_id': ObjectId(provider_id), 'role': 'provider'},
         {'$set': {'is_verified': True, 'verified_at': datetime.utcnow()}}
     )
+    invalidate_user(provider_id)
     
     if result.matched_count == 0:
         return jsonify({'error': 'Provider not found'}), 404
     return jsonify({'message': 'Provider verified'}), 200
 
+@admin_bp.route('/services', methods=['POST'])
+@token_required
+@admin_required
+def upsert_service():
+    """Create or update a service category by name"""
+    data = request.get_json()
+    if not data or not all(k in data for k in ('name', 'category', 'description')):
+        return jsonify({'error': 'Missing required fields: name, category, description'}), 400
+
+    db = get_database()
+    db.services.update_one(
+        {'name': data['name']},
+        {'$set': {'category': data['category'], 'description': data['description']}},
+        upsert=True
+    )
+    service_catalogue.invalidate()
+    return jsonify({'message': 'Service saved'}), 200
+
+@admin_bp.route('/services/<name>', methods=['DELETE'])
+@token_required
+@admin_required
+def delete_service(name):
+    """Remove a service category"""
+    db = get_database()
+    result = db.services.delete_one({'name': name})
+    if result.deleted_count == 0:
+        return jsonify({'error': 'Service not found'}), 404
+    service_catalogue.invalidate()
+    return jsonify({'message': 'Service deleted'}), 200
+
+@admin_bp.route('/pool-stats', methods=['GET'])
+@token_required
+@admin_required
+def pool_stats():
+    """MongoDB connection pool and password hashing pool counters for this worker"""
+    return jsonify({**pool_metrics.snapshot(), 'password_pool': password_pool.stats()}), 200
+
+@admin_bp.route('/cache-stats', methods=['GET'])
+@token_required
+@admin_required
+def cache_stats():
+    """Hit/miss counters of this worker's in-process caches"""
+    return jsonify({
+        'users': user_cache.stats(),
+        'tokens': token_cache.stats(),
+        'pages': page_cache.stats()
+    }), 200
+
+@admin_bp.route('/users/import', methods=['POST'])
+@token_required
+@admin_required
+def bulk_import_users():
+    """Register a batch of users (providers by default); reports per-row conflicts"""
+    data = request.get_json(silent=True) or {}
+    rows = data.get('users')
+    if not isinstance(rows, list) or not rows:
+        return jsonify({'error': 'users must be a non-empty list'}), 400
+    role = data.get('role', 'provider')
+    if role not in IMPORT_ROLES:
+        return jsonify({'error': f"role must be one of: {', '.join(IMPORT_ROLES)}"}), 400
+
+    result = import_users(rows, default_role=role)
+    return jsonify(result), 200 if result['errors'] else 201
+
+@admin_bp.route('/rate-limit-stats', methods=['GET'])
+@token_required
+@admin_required
+def rate_limit_stats():
+    """Login rate limiter counters for this worker"""
+    return jsonify(login_limiter.stats()), 200
+
 @admin_bp.route('/disputes', methods=['GET', 'POST'])
+@token_required
 @admin_required
 def manage_disputes():
     """Get or create disputes"""
@@ -39,59 +121,117 @@ def manage_disputes():
         result = db.disputes.insert_one(dispute)
         return jsonify({'dispute_id': str(result.inserted_id)}), 201
     else:
-        disputes = list(db.disputes.find())
-        for dispute in disputes:
-            dispute['_id'] = str(dispute['_id'])
-            dispute['booking_id'] = str(dispute['booking_id'])
-            dispute['customer_id'] = str(dispute['customer_id'])
-            dispute['provider_id'] = str(dispute['provider_id'])
-        return jsonify(disputes), 200
+        return stream_json(db.disputes.find().sort('created_at', -1))
+
+def _user_name_lookup(local_field, as_field):
+    """$lookup stage that pulls only the fullName of the referenced user"""
+    return {
+        '$lookup': {
+            'from': 'users',
+            'localField': local_field,
+            'foreignField': '_id',
+            'pipeline': [{'$project': {'_id': 0, 'fullName': 1}}],
+            'as': as_field
+        }
+    }
+
+def daily_bookings_pipeline(since):
+    """Aggregation that joins customer/provider names onto bookings server-side"""
+    return [
+        {'$match': {'created_at': {'$gte': since}}},
+        _user_name_lookup('customer_id', '_customer'),
+        _user_name_lookup('provider_id', '_provider'),
+        {'$set': {
+            'customer_name': {'$ifNull': [{'$first': '$_customer.fullName'}, 'Unknown']},
+            'provider_name': {'$ifNull': [{'$first': '$_provider.fullName'}, 'Unknown']}
+        }},
+        {'$unset': ['_customer', '_provider']}
+    ]
 
 @admin_bp.route('/reports/daily-bookings', methods=['GET'])
+@token_required
 @admin_required
 def daily_bookings_report():
     """Generate daily bookings report"""
-    db = get_database()
+    db = get_reports_database()
     today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    bookings = list(db.bookings.find({'created_at': {'$gte': today}}))
-    
-    # Enhance with customer/provider names
-    for booking in bookings:
-        customer = db.users.find_one({'_id': booking['customer_id']})
-        provider = db.users.find_one({'_id': booking['provider_id']})
-        booking['customer_name'] = customer['fullName'] if customer else 'Unknown'
-        booking['provider_name'] = provider['fullName'] if provider else 'Unknown'
-        booking['_id'] = str(booking['_id'])
-        booking['customer_id'] = str(booking['customer_id'])
-        booking['provider_id'] = str(booking['provider_id'])
-    
+    # One aggregate round trip regardless of how many bookings were made today
+    bookings = list(db.bookings.aggregate(daily_bookings_pipeline(today)))
     return jsonify(bookings), 200
 
+PROVIDER_ACTIVITY_SORTS = ('provider_id', 'total_jobs', 'avg_rating')
+
+def provider_activity_pipeline(sort='provider_id', after=None, limit=DEFAULT_LIMIT):
+    """Aggregation over providers reading the booking rollups kept on each
+    provider document (see lib/rollups.py), so no bookings are scanned.
+
+    Every sort is on a stored field with a matching index and pages with a
+    keyset on (sort key, _id), so each page costs the same however many
+    providers there are. avg_rating is the rollup's rating_avg: the mean of
+    rated jobs, null until the provider has one, as on /api/providers.
+    """
+    shape = {'$project': {
+        '_id': 1,
+        'provider_name': '$fullName',
+        'total_jobs': {'$ifNull': ['$stats.completed_jobs', 0]},
+        'avg_rating': {'$ifNull': ['$rating_avg', None]},
+        'stats.completed_jobs': 1
+    }}
+
+    sort_field = {'total_jobs': 'stats.completed_jobs', 'avg_rating': 'rating_avg'}.get(sort)
+    pipeline = [{'$match': {'role': 'provider'}}]
+    if sort_field is None:
+        if after is not None:
+            pipeline.append({'$match': {'_id': {'$gt': after[1]}}})
+        pipeline += [{'$sort': {'_id': 1}}, {'$limit': limit}, shape]
+    else:
+        if after is not None:
+            pipeline.append({'$match': keyset_filter(sort_field, after[0], after[1])})
+        pipeline += [{'$sort': {sort_field: -1, '_id': -1}}, {'$limit': limit}, shape]
+    return pipeline
+
+def provider_activity_args(args):
+    """Parse sort/limit/cursor for the provider-activity report; raises ValueError"""
+    sort = args.get('sort', 'provider_id')
+    if sort not in PROVIDER_ACTIVITY_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(PROVIDER_ACTIVITY_SORTS)}")
+    limit = parse_limit(args.get('limit'))
+    cursor = args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+    return sort, after, limit
+
+def provider_activity_page(rows, sort, limit) -> dict:
+    """Shape one page of provider_activity_pipeline rows as the report response"""
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        if sort == 'total_jobs':
+            sort_value = (last.get('stats') or {}).get('completed_jobs')
+        else:
+            sort_value = last.get(sort) if sort != 'provider_id' else None
+        next_cursor = encode_cursor(sort_value, last['_id'])
+
+    report = [{
+        'provider_id': row['_id'],
+        'provider_name': row.get('provider_name'),
+        'total_jobs': row['total_jobs'],
+        'avg_rating': row['avg_rating']
+    } for row in rows]
+    return {'providers': report, 'next_cursor': next_cursor}
+
 @admin_bp.route('/reports/provider-activity', methods=['GET'])
+@token_required
 @admin_required
 def provider_activity_report():
     """Provider activity report"""
-    db = get_database()
-    providers = list(db.users.find({'role': 'provider'}))
-    
-    report = []
-    for provider in providers:
-        bookings = list(db.bookings.find({
-            'provider_id': provider['_id'],
-            'status': 'completed'
-        }))
-        
-        total_jobs = len(bookings)
-        if total_jobs > 0:
-            avg_rating = sum(b.get('rating', 0) for b in bookings) / total_jobs
-        else:
-            avg_rating = 0
-            
-        report.append({
-            'provider_id': str(provider['_id']),
-            'provider_name': provider['fullName'],
-            'total_jobs': total_jobs,
-            'avg_rating': round(avg_rating, 2)
-        })
-    
-    return jsonify(report), 200
\ No newline at end of file
+    try:
+        sort, after, limit = provider_activity_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_reports_database()
+    rows = list(db.users.aggregate(
+        provider_activity_pipeline(sort, after, limit),
+        allowDiskUse=True
+    ))
+    return jsonify(provider_activity_page(rows, sort, limit)), 200
@@ -0,0 +1,265 @@
+# routes/async_api.py
+"""Async (Quart + Motor) versions of the I/O-bound read endpoints and the
+job feed stream, served by asgi.py. Query building is shared with the sync
+blueprints; any route not defined here is handled by the Flask app."""
+
+import asyncio
+import json
+from datetime import datetime
+from functools import wraps
+from quart import Blueprint, Response, current_app, jsonify, request
+from lib.auth import get_user_async, verify_token
+from lib.catalogue import service_catalogue, CATALOGUE_MAX_AGE
+from lib.decorators import extract_token
+from lib.job_feed import fetch_delta, job_feed
+from lib.motor_db import get_motor_database, get_motor_reports_database
+from lib.streaming import JSONChunker, STREAM_ABORTED, STREAM_BATCH_SIZE, ndjson_requested
+from routes.admin import (daily_bookings_pipeline, provider_activity_args,
+                          provider_activity_page, provider_activity_pipeline)
+from routes.bookings import MY_BOOKINGS_SORT, bookings_page_tail, my_bookings_query
+from routes.feed import (HEARTBEAT_INTERVAL, POLL_INTERVAL, STREAM_RETRY_AFTER, delta_messages,
+                         feed_event_id, resume_point, sse_message)
+from routes.requests import (TOMBSTONE_PROJECTION, delta_tail, my_requests_delta_query,
+                             pending_delta_queries, updated_since_arg, watermark_header)
+from lib.pagination import sync_watermark
+from routes.services import next_page_cursor, provider_search_pipeline
+
+async_api_bp = Blueprint('async_api', __name__)
+
+def token_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        token = extract_token(request)
+        if not token:
+            return jsonify({'error': 'Token is missing!'}), 401
+        payload = verify_token(token)
+        if not payload:
+            return jsonify({'error': 'Token is invalid or expired!'}), 401
+        request.current_user = payload
+        return await f(*args, **kwargs)
+    return decorated
+
+def admin_required(f):
+    @wraps(f)
+    async def decorated(*args, **kwargs):
+        user = getattr(request, "current_user", None)
+        if not user:
+            return jsonify({"error": "Authentication required"}), 401
+        if user.get("role") != "admin":
+            return jsonify({"error": "Admin access required"}), 403
+        return await f(*args, **kwargs)
+    return decorated
+
+async def get_current_user():
+    """Async counterpart of routes/requests.py:get_current_user"""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header:
+        user_str = request.headers.get('x-user')
+        if user_str:
+            try:
+                return json.loads(user_str)
+            except ValueError:
+                return None
+        return None
+    token = auth_header.split(' ')[1] if ' ' in auth_header else auth_header
+    payload = verify_token(token)
+    if not payload or not payload.get('user_id'):
+        return None
+    try:
+        user = await get_user_async(get_motor_database(), payload['user_id'])
+    except Exception as e:
+        # Same as the sync get_user_from_token: a bad id means no user, not a 500
+        print(f"Error getting user from token: {e}")
+        return None
+    if not user:
+        return None
+    return {
+        'id': str(user['_id']),
+        'username': user['username'],
+        'fullName': user['fullName'],
+        'email': user['email'],
+        'role': user['role']
+    }
+
+async def stream_json(cursor, key=None, tail=None, batch_size=STREAM_BATCH_SIZE):
+    """Async lib.streaming.stream_json over a Motor cursor"""
+    chunker = JSONChunker(current_app.json.dumps,
+                          ndjson_requested(request.args, request.accept_mimetypes),
+                          key, tail, batch_size=batch_size)
+    docs = cursor.batch_size(batch_size).__aiter__()
+    # First batch now, so query errors fail the request instead of the body
+    try:
+        first = [await docs.__anext__()]
+    except StopAsyncIteration:
+        first = []
+
+    async def generate():
+        try:
+            yield chunker.open().encode('utf-8')
+            for doc in first:
+                chunk = chunker.add(doc)
+                if chunk:
+                    yield chunk.encode('utf-8')
+            if first:
+                async for doc in docs:
+                    chunk = chunker.add(doc)
+                    if chunk:
+                        yield chunk.encode('utf-8')
+            yield chunker.close().encode('utf-8')
+        except Exception as e:
+            print(f"❌ Stream aborted: {e}")
+            yield STREAM_ABORTED.encode('utf-8')
+            raise
+
+    return Response(generate(), mimetype=chunker.mimetype)
+
+# services blueprint
+
+@async_api_bp.route('/api/services', methods=['GET'])
+async def get_services():
+    body, etag = await service_catalogue.get_async(get_motor_database())
+    if etag in request.if_none_match:
+        response = Response('', status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = CATALOGUE_MAX_AGE
+    return response
+
+@async_api_bp.route('/api/providers', methods=['GET'])
+async def get_providers():
+    try:
+        pipeline, sort_field, limit = provider_search_pipeline(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    providers = await get_motor_database().users.aggregate(pipeline).to_list(None)
+    return jsonify({
+        'providers': providers,
+        'next_cursor': next_page_cursor(providers, sort_field, limit)
+    }), 200
+
+# bookings blueprint
+
+@async_api_bp.route('/api/my-bookings', methods=['GET'])
+@token_required
+async def get_my_bookings():
+    try:
+        query, projection, limit = my_bookings_query(request.current_user, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    cursor = get_motor_database().bookings.find(query, projection).sort(MY_BOOKINGS_SORT).limit(limit)
+    return await stream_json(cursor, key='bookings', tail=bookings_page_tail(limit))
+
+# requests blueprint
+
+@async_api_bp.route('/api/requests/my-requests', methods=['GET'])
+async def get_my_requests():
+    user = await get_current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+    try:
+        since = updated_since_arg(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    requests = get_motor_database().service_requests
+    watermark = sync_watermark()
+    if since is not None:
+        cursor = requests.find(my_requests_delta_query(user['id'], since)).sort('updatedAt', 1)
+        return await stream_json(cursor, key='requests', tail=delta_tail([], watermark))
+    cursor = requests.find({'customerId': user['id']}).sort('createdAt', -1)
+    return watermark_header(await stream_json(cursor), watermark)
+
+@async_api_bp.route('/api/requests/pending', methods=['GET'])
+async def get_pending_requests():
+    try:
+        since = updated_since_arg(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    requests = get_motor_database().service_requests
+    watermark = sync_watermark()
+    if since is not None:
+        changed, removed = pending_delta_queries(since)
+        tombstones = await requests.find(removed, TOMBSTONE_PROJECTION).to_list(None)
+        cursor = requests.find(changed).sort('updatedAt', 1)
+        return await stream_json(cursor, key='requests', tail=delta_tail(tombstones, watermark))
+    cursor = requests.find({'status': 'pending'}).sort('createdAt', -1)
+    return watermark_header(await stream_json(cursor), watermark)
+
+# admin blueprint
+
+@async_api_bp.route('/api/admin/disputes', methods=['GET'])
+@token_required
+@admin_required
+async def list_disputes():
+    return await stream_json(get_motor_database().disputes.find().sort('created_at', -1))
+
+@async_api_bp.route('/api/admin/reports/daily-bookings', methods=['GET'])
+@token_required
+@admin_required
+async def daily_bookings_report():
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    cursor = get_motor_reports_database().bookings.aggregate(daily_bookings_pipeline(today))
+    return jsonify(await cursor.to_list(None)), 200
+
+@async_api_bp.route('/api/admin/reports/provider-activity', methods=['GET'])
+@token_required
+@admin_required
+async def provider_activity_report():
+    try:
+        sort, after, limit = provider_activity_args(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    cursor = get_motor_reports_database().users.aggregate(
+        provider_activity_pipeline(sort, after, limit), allowDiskUse=True
+    )
+    rows = await cursor.to_list(None)
+    return jsonify(provider_activity_page(rows, sort, limit)), 200
+
+# feed blueprint
+
+@async_api_bp.route('/api/feed/jobs/stream', methods=['GET'])
+@token_required
+async def jobs_stream():
+    """routes/feed.py:jobs_stream on the event loop: a waiting client holds no
+    thread, so there is no per-worker stream cap here"""
+    user = request.current_user
+    resume_from = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        since, after_id = resume_point(resume_from) if resume_from else (None, None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if job_feed.available is False:
+        return jsonify({'error': 'Live updates unavailable, poll /api/feed/jobs instead'}), 503, \
+            {'Retry-After': str(STREAM_RETRY_AFTER)}
+    dumps = current_app.json.dumps
+
+    async def generate():
+        sub = job_feed.subscribe_async(user)
+        try:
+            yield f"retry: {int(POLL_INTERVAL * 1000)}\n\n".encode('utf-8')
+            if since is not None:
+                delta = await asyncio.to_thread(fetch_delta, user, since, after_id)
+                for message in delta_messages(dumps, delta):
+                    yield message.encode('utf-8')
+
+            # Ends if the watcher finds no change streams; the reconnect gets a 503
+            while job_feed.available is not False:
+                try:
+                    event = await asyncio.wait_for(sub.events.get(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if sub.overflowed:
+                    sub.overflowed = False
+                    yield sse_message(dumps, 'resync', {}).encode('utf-8')
+                yield sse_message(dumps, event['type'], event, feed_event_id(event)).encode('utf-8')
+        finally:
+            job_feed.unsubscribe(sub)
+
+    response = Response(generate(), mimetype='text/event-stream')
+    # Quart cuts responses off after RESPONSE_TIMEOUT; this one runs until the client leaves
+    response.timeout = None
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
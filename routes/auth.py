@@ -2,12 +2,19 @@
 
 from flask import Blueprint, request, jsonify, make_response
 from lib.mongodb import get_database
-from lib.auth import verify_password, generate_token, hash_password
-from datetime import datetime
+from lib.auth import verify_password, generate_token, hash_password, needs_rehash
+from lib.password_pool import PasswordPoolBusy
+from lib.rate_limit import login_limiter, client_ip
+from lib.accounts import new_user, duplicate_key_message, existing_user_message
+from pymongo.errors import DuplicateKeyError
 import traceback
 
 auth_bp = Blueprint('auth', __name__)
 
+def busy_response():
+    """503 for requests shed because the password hashing pool is saturated"""
+    return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': '1'}
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """User login endpoint"""
@@ -23,6 +30,12 @@ def login():
         if not all([username, password, role]):
             return jsonify({'error': 'Missing username, password, or role'}), 400
         
+        # Before any DB or KDF work, so rejected attempts cost almost nothing
+        retry_after = login_limiter.check(client_ip(request), username)
+        if retry_after is not None:
+            return jsonify({'error': 'Too many login attempts, please try again later'}), 429, \
+                {'Retry-After': str(retry_after)}
+        
         db = get_database()
         users_collection = db['users']
         user = users_collection.find_one({'username': username, 'role': role})
@@ -30,6 +43,18 @@ def login():
         if not user or not verify_password(password, user.get('password', '')):
             return jsonify({'error': 'Invalid credentials'}), 401
         
+        login_limiter.succeeded(username)
+        
+        if needs_rehash(user['password']):
+            try:
+                # Conditional on the old hash so a concurrent password change wins
+                users_collection.update_one(
+                    {'_id': user['_id'], 'password': user['password']},
+                    {'$set': {'password': hash_password(password)}}
+                )
+            except PasswordPoolBusy:
+                pass  # upgraded on a later login
+        
         user_data = {
             'id': str(user['_id']),
             'username': user['username'],
@@ -56,6 +81,8 @@ def login():
         print(f"✅ LOGIN SUCCESS: Token cookie set for user '{username}' (role: {role})")
         return response
         
+    except PasswordPoolBusy:
+        return busy_response()
     except Exception as error:
         print("=== LOGIN ERROR ===")
         traceback.print_exc()
@@ -81,20 +108,18 @@ def signup():
         db = get_database()
         users_collection = db['users']
         
-        if users_collection.find_one({'username': username}):
-            return jsonify({'error': 'Username already exists'}), 400
-        if users_collection.find_one({'email': email}):
-            return jsonify({'error': 'Email already in use'}), 400
+        duplicate = existing_user_message(users_collection, username, email)
+        if duplicate:
+            return jsonify({'error': duplicate}), 400
         
         hashed_password = hash_password(password)
-        result = users_collection.insert_one({
-            'username': username,
-            'email': email,
-            'password': hashed_password,
-            'fullName': full_name,
-            'role': role,
-            'createdAt': datetime.utcnow()
-        })
+        try:
+            # The username_unique / email_unique indexes reject duplicates atomically
+            result = users_collection.insert_one(
+                new_user(username, email, hashed_password, full_name, role)
+            )
+        except DuplicateKeyError as e:
+            return jsonify({'error': duplicate_key_message(e)}), 400
         
         user = {
             'id': str(result.inserted_id),
@@ -122,6 +147,8 @@ def signup():
         print(f"✅ SIGNUP SUCCESS: Token cookie set for user '{username}' (role: {role})")
         return response
         
+    except PasswordPoolBusy:
+        return busy_response()
     except Exception as error:
         print("=== SIGNUP ERROR ===")
         traceback.print_exc()
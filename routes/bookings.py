@@ -1,65 +1,274 @@
 # routes/bookings.py
+import re
 from flask import Blueprint, request, jsonify
 from lib.mongodb import get_database
 from lib.decorators import token_required
+from lib.streaming import stream_json
+from lib.rollups import record_accepted, record_accepted_many, record_completed, record_completed_many
+from lib.availability import release, release_many
+from lib.pagination import parse_limit, encode_cursor, decode_cursor, keyset_filter
 from datetime import datetime
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
 
 bookings_bp = Blueprint('bookings', __name__)
 
-@bookings_bp.route('/my-bookings', methods=['GET'])
-@token_required
-def get_my_bookings():
-    """Get bookings for current user (customer or provider)"""
-    db = get_database()
-    user_id = ObjectId(request.current_user['user_id'])
-    role = request.current_user['role']
+FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def parse_fields(value: str) -> dict:
+    """Turn ?fields=a,b,c into a projection; created_at is kept for the cursor"""
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    for field in fields:
+        if not FIELD_NAME.match(field):
+            raise ValueError(f"Invalid field name: {field}")
+    projection = {field: 1 for field in fields}
+    projection['created_at'] = 1
+    return projection
+
+MY_BOOKINGS_SORT = [('created_at', -1), ('_id', -1)]
+
+# Booking state transitions: the caller must own the booking through `owner`
+# and it must be in state `from`
+TRANSITIONS = {
+    'accept': {'owner': 'provider_id', 'from': 'pending', 'to': 'accepted', 'stamp': 'accepted_at'},
+    'complete': {'owner': 'customer_id', 'from': 'accepted', 'to': 'completed', 'stamp': 'completed_at'},
+    # Frees the provider's time again (see lib/availability.py)
+    'decline': {'owner': 'provider_id', 'from': 'pending', 'to': 'declined', 'stamp': 'declined_at'},
+}
+MAX_BATCH_TRANSITIONS = 100
+
+def transition_filter(action: str, booking_id: ObjectId, user_id: ObjectId) -> dict:
+    """Match the booking only if the transition's preconditions hold"""
+    transition = TRANSITIONS[action]
+    return {'_id': booking_id, transition['owner']: user_id, 'status': transition['from']}
+
+def transition_update(action: str, now: datetime, rating=None) -> dict:
+    """$set for a transition; rating only applies to complete"""
+    transition = TRANSITIONS[action]
+    update = {'status': transition['to'], transition['stamp']: now, 'updated_at': now}
+    if action == 'complete' and rating is not None:
+        update['rating'] = rating
+    return update
+
+def rating_error(rating):
+    """Error message for an invalid rating, else None"""
+    if isinstance(rating, bool) or not isinstance(rating, (int, float)) or not 1 <= rating <= 5:
+        return 'rating must be a number from 1 to 5'
+    return None
+
+def my_bookings_query(current_user: dict, args):
+    """Build the /api/my-bookings find() from the token payload and query args.
+
+    Returns (query, projection, limit); raises ValueError for bad input.
+    Shared by the sync route and the async API.
+    """
+    user_id = ObjectId(current_user['user_id'])
     
-    if role == 'customer':
+    if current_user['role'] == 'customer':
         query = {'customer_id': user_id}
     else:  # provider
         query = {'provider_id': user_id}
-    
-    bookings = list(db.bookings.find(query))
-    for booking in bookings:
-        booking['_id'] = str(booking['_id'])
-        booking['customer_id'] = str(booking['customer_id'])
-        booking['provider_id'] = str(booking['provider_id'])
-    
-    return jsonify(bookings), 200
+
+    limit = parse_limit(args.get('limit'))
+    cursor = args.get('cursor')
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        query.update(keyset_filter('created_at', created_at, last_id))
+    fields = args.get('fields')
+    projection = parse_fields(fields) if fields else None
+
+    status = args.get('status')
+    if status:
+        query['status'] = status
+    return query, projection, limit
+
+def bookings_page_tail(limit):
+    """stream_json tail that writes next_cursor after a page of bookings"""
+    def tail(last, count):
+        next_cursor = None
+        if count == limit:
+            next_cursor = encode_cursor(last.get('created_at'), last['_id'])
+        return {'next_cursor': next_cursor}
+    return tail
+
+@bookings_bp.route('/my-bookings', methods=['GET'])
+@token_required
+def get_my_bookings():
+    """Get bookings for current user (customer or provider), newest first.
+
+    Query params: limit, cursor (next_cursor of the previous page), status,
+    fields (comma-separated projection).
+    """
+    try:
+        query, projection, limit = my_bookings_query(request.current_user, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_database()
+    bookings = db.bookings.find(query, projection).sort(MY_BOOKINGS_SORT).limit(limit)
+    return stream_json(bookings, key='bookings', tail=bookings_page_tail(limit))
+
+def my_bookings_summary_pipeline(current_user: dict) -> list:
+    """Per-status counts, earnings and rating totals over all of the user's bookings"""
+    query, _, _ = my_bookings_query(current_user, {})
+    return [
+        {'$match': query},
+        {'$group': {
+            '_id': '$status',
+            'count': {'$sum': 1},
+            'price_sum': {'$sum': {'$cond': [{'$isNumber': '$price'}, '$price', 0]}},
+            'rating_sum': {'$sum': {'$cond': [{'$isNumber': '$rating'}, '$rating', 0]}},
+            'rating_count': {'$sum': {'$cond': [{'$isNumber': '$rating'}, 1, 0]}}
+        }}
+    ]
+
+@bookings_bp.route('/my-bookings/summary', methods=['GET'])
+@token_required
+def get_my_bookings_summary():
+    """Dashboard totals across every booking, not just the first page of /my-bookings"""
+    db = get_database()
+    by_status = {row['_id']: row for row in db.bookings.aggregate(my_bookings_summary_pipeline(request.current_user))}
+    completed = by_status.get('completed', {})
+    rating_count = completed.get('rating_count', 0)
+    return jsonify({
+        'completed_jobs': completed.get('count', 0),
+        'total_earnings': completed.get('price_sum', 0),
+        'avg_rating': round(completed['rating_sum'] / rating_count, 2) if rating_count else None,
+        'pending_requests': by_status.get('pending', {}).get('count', 0),
+        'by_status': {status: row['count'] for status, row in by_status.items()}
+    }), 200
 
 @bookings_bp.route('/<booking_id>/accept', methods=['POST'])
 @token_required
 def accept_booking(booking_id):
     """Provider accepts a booking"""
     db = get_database()
-    result = db.bookings.update_one(
-        {
-            '_id': ObjectId(booking_id),
-            'provider_id': ObjectId(request.current_user['user_id']),
-            'status': 'pending'
-        },
-        {'$set': {'status': 'accepted', 'accepted_at': datetime.utcnow()}}
+    now = datetime.utcnow()
+    booking = db.bookings.find_one_and_update(
+        transition_filter('accept', ObjectId(booking_id), ObjectId(request.current_user['user_id'])),
+        {'$set': transition_update('accept', now)},
+        projection={'provider_id': 1, 'created_at': 1}
     )
     
-    if result.matched_count == 0:
+    if booking is None:
         return jsonify({'error': 'Booking not found or already accepted'}), 404
+    # Only the request that won the pending -> accepted transition counts it
+    latency = (now - booking['created_at']).total_seconds() if booking.get('created_at') else 0
+    record_accepted(booking['provider_id'], latency, db)
     return jsonify({'message': 'Booking accepted'}), 200
 
+@bookings_bp.route('/<booking_id>/decline', methods=['POST'])
+@token_required
+def decline_booking(booking_id):
+    """Provider turns down a pending booking, freeing that time slot"""
+    db = get_database()
+    booking = db.bookings.find_one_and_update(
+        transition_filter('decline', ObjectId(booking_id), ObjectId(request.current_user['user_id'])),
+        {'$set': transition_update('decline', datetime.utcnow())},
+        projection={'provider_id': 1}
+    )
+
+    if booking is None:
+        return jsonify({'error': 'Booking not found or not pending'}), 404
+    release(booking['provider_id'], booking['_id'], db)
+    return jsonify({'message': 'Booking declined'}), 200
+
 @bookings_bp.route('/<booking_id>/complete', methods=['POST'])
 @token_required
 def complete_booking(booking_id):
-    """Mark booking as completed"""
+    """Mark booking as completed, optionally with a 1-5 rating"""
+    data = request.get_json(silent=True) or {}
+    rating = data.get('rating')
+    if rating is not None and rating_error(rating):
+        return jsonify({'error': rating_error(rating)}), 400
+
     db = get_database()
-    result = db.bookings.update_one(
-        {
-            '_id': ObjectId(booking_id),
-            'customer_id': ObjectId(request.current_user['user_id']),
-            'status': 'accepted'
-        },
-        {'$set': {'status': 'completed', 'completed_at': datetime.utcnow()}}
+    booking = db.bookings.find_one_and_update(
+        transition_filter('complete', ObjectId(booking_id), ObjectId(request.current_user['user_id'])),
+        {'$set': transition_update('complete', datetime.utcnow(), rating)},
+        projection={'provider_id': 1}
     )
     
-    if result.matched_count == 0:
+    if booking is None:
         return jsonify({'error': 'Booking not found or not in accepted state'}), 404
-    return jsonify({'message': 'Booking completed'}), 200
\ No newline at end of file
+    record_completed(booking['provider_id'], rating, db)
+    return jsonify({'message': 'Booking completed'}), 200
+
+@bookings_bp.route('/bookings/transitions', methods=['POST'])
+@token_required
+def batch_transition():
+    """Apply one transition to many bookings in a single bulk write.
+
+    Body: {"action": "accept" | "complete" | "decline", "booking_ids": [...],
+    "ratings": {"<booking_id>": 1-5}} (ratings only for complete). Each
+    booking keeps the single-booking preconditions; the response has one
+    {"id", "ok", "error"?} result per id, in request order.
+    """
+    data = request.get_json(silent=True) or {}
+    action = data.get('action')
+    if action not in TRANSITIONS:
+        return jsonify({'error': f"action must be one of: {', '.join(TRANSITIONS)}"}), 400
+    booking_ids = data.get('booking_ids')
+    if not isinstance(booking_ids, list) or not booking_ids:
+        return jsonify({'error': 'booking_ids must be a non-empty list'}), 400
+    if len(booking_ids) > MAX_BATCH_TRANSITIONS:
+        return jsonify({'error': f"At most {MAX_BATCH_TRANSITIONS} bookings per call"}), 400
+    ratings = data.get('ratings') or {}
+    if not isinstance(ratings, dict):
+        return jsonify({'error': 'ratings must be an object of booking id to rating'}), 400
+    for rating in ratings.values():
+        if rating_error(rating):
+            return jsonify({'error': rating_error(rating)}), 400
+
+    order = list(dict.fromkeys(str(booking_id) for booking_id in booking_ids))
+    results, targets = {}, {}
+    for key in order:
+        try:
+            targets[key] = ObjectId(key)
+        except InvalidId:
+            results[key] = {'id': key, 'ok': False, 'error': 'Invalid booking id'}
+
+    applied = []
+    if targets:
+        db = get_database()
+        transition = TRANSITIONS[action]
+        user_id = ObjectId(request.current_user['user_id'])
+        now = datetime.utcnow()
+        # Stamped on every booking this call moves, so one read afterwards
+        # tells which guarded updates matched
+        transition_id = ObjectId()
+        db.bookings.bulk_write([
+            UpdateOne(transition_filter(action, booking_id, user_id),
+                      {'$set': {**transition_update(action, now, ratings.get(key)),
+                                'transition_id': transition_id}})
+            for key, booking_id in targets.items()
+        ], ordered=False)
+
+        found = {doc['_id']: doc for doc in db.bookings.find(
+            {'_id': {'$in': list(targets.values())}},
+            {transition['owner']: 1, 'provider_id': 1, 'status': 1, 'created_at': 1, 'transition_id': 1}
+        )}
+        for key, booking_id in targets.items():
+            doc = found.get(booking_id)
+            if doc is not None and doc.get('transition_id') == transition_id:
+                results[key] = {'id': key, 'ok': True}
+                applied.append(doc)
+            elif doc is None or doc.get(transition['owner']) != user_id:
+                results[key] = {'id': key, 'ok': False, 'error': 'Booking not found'}
+            else:
+                results[key] = {'id': key, 'ok': False,
+                                'error': f"Booking is {doc.get('status')}, not {transition['from']}"}
+
+        # Rollups for the bookings this call moved, batched like the updates
+        if applied and action == 'accept':
+            record_accepted_many(user_id, [
+                (now - doc['created_at']).total_seconds() if doc.get('created_at') else 0
+                for doc in applied
+            ], db)
+        elif applied and action == 'decline':
+            release_many([(doc['provider_id'], doc['_id']) for doc in applied], db)
+        elif applied:
+            record_completed_many([(doc['provider_id'], ratings.get(str(doc['_id']))) for doc in applied], db)
+
+    return jsonify({'results': [results[key] for key in order], 'succeeded': len(applied)}), 200
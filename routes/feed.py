@@ -0,0 +1,149 @@
+# routes/feed.py
+
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from lib.decorators import token_required
+from lib.job_feed import job_feed, fetch_delta
+from lib.pagination import decode_cursor, encode_cursor, parse_timestamp, sync_watermark
+
+feed_bp = Blueprint('feed', __name__)
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = float(os.getenv('FEED_HEARTBEAT_INTERVAL', '15'))
+# Seconds between delta polls when change streams are unavailable
+POLL_INTERVAL = float(os.getenv('FEED_POLL_INTERVAL', '5'))
+# An open stream holds a request thread for as long as the client stays, so
+# each worker keeps at most this many (by default half its gthread threads)
+FEED_MAX_STREAMS = int(os.getenv('FEED_MAX_STREAMS', max(1, int(os.getenv('GUNICORN_THREADS', '4')) // 2)))
+# Seconds a refused client should poll GET /jobs before trying the stream again
+STREAM_RETRY_AFTER = int(os.getenv('FEED_STREAM_RETRY_AFTER', '60'))
+
+_stream_slots = threading.BoundedSemaphore(FEED_MAX_STREAMS)
+
+def _event_time(event) -> datetime:
+    doc = event['doc']
+    return doc.get('updated_at') or doc.get('updatedAt') or datetime.utcnow()
+
+def _event_key(event) -> tuple:
+    return _event_time(event), event['doc']['_id']
+
+def feed_event_id(event) -> str:
+    # Timestamps tie, so the id carries _id too and resuming skips nothing
+    return encode_cursor(*_event_key(event))
+
+def resume_point(value: str) -> tuple:
+    """(since, after_id) from ?since= or Last-Event-ID; raises ValueError"""
+    try:
+        return parse_timestamp(value), None
+    except ValueError:
+        pass
+    values = decode_cursor(value)
+    if len(values) != 2 or not isinstance(values[0], datetime):
+        raise ValueError('Invalid event id')
+    return values[0], values[1]
+
+def sse_message(dumps, event_type: str, data, event_id: str = None) -> str:
+    """One SSE message; dumps is the app's JSON encoder (Flask or Quart)"""
+    lines = [f"event: {event_type}"]
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {dumps(data)}")
+    return '\n'.join(lines) + '\n\n'
+
+def _delta_events(delta: dict):
+    events = [{'type': 'booking', 'op': 'delta', 'doc': doc} for doc in delta['bookings']]
+    events += [{'type': 'service_request', 'op': 'delta', 'doc': doc} for doc in delta['service_requests']]
+    return sorted(events, key=_event_key)
+
+def delta_messages(dumps, delta: dict):
+    """SSE messages for a fetch_delta() result"""
+    if delta['resync']:
+        yield sse_message(dumps, 'resync', {})
+        return
+    for event in _delta_events(delta):
+        yield sse_message(dumps, event['type'], event, feed_event_id(event))
+
+@feed_bp.route('/jobs', methods=['GET'])
+@token_required
+def jobs_delta():
+    """Bookings and service requests changed since ?since= (ISO 8601, epoch ms or a stream event id).
+
+    Poll with the returned watermark as the next since. resync: true means
+    there were too many changes to list; reload the lists instead.
+    """
+    since = request.args.get('since')
+    if not since:
+        return jsonify({'error': 'Missing since parameter'}), 400
+    try:
+        since, after_id = resume_point(since)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(fetch_delta(request.current_user, since, after_id)), 200
+
+@feed_bp.route('/jobs/stream', methods=['GET'])
+@token_required
+def jobs_stream():
+    """Server-Sent Events feed of the current user's booking and request changes.
+
+    Reconnecting clients send Last-Event-ID (or ?since=) and first receive
+    what they missed. Event types: booking, service_request, resync (events
+    were dropped or too many were missed; refetch the lists).
+
+    Answers 503 with Retry-After once this worker has FEED_MAX_STREAMS open,
+    or when there are no change streams; clients then poll GET /jobs.
+    """
+    user = request.current_user
+    resume_from = request.headers.get('Last-Event-ID') or request.args.get('since')
+    try:
+        since, after_id = resume_point(resume_from) if resume_from else (None, None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if job_feed.available is False or not _stream_slots.acquire(blocking=False):
+        return jsonify({'error': 'Live updates unavailable, poll /api/feed/jobs instead'}), 503, \
+            {'Retry-After': str(STREAM_RETRY_AFTER)}
+
+    dumps = current_app.json.dumps
+
+    def generate():
+        sub = job_feed.subscribe(user)
+        watermark = since or sync_watermark()
+        try:
+            yield f"retry: {int(POLL_INTERVAL * 1000)}\n\n"
+            if since is not None:
+                delta = fetch_delta(user, since, after_id)
+                yield from delta_messages(dumps, delta)
+                watermark = delta['watermark']
+
+            while True:
+                if job_feed.available is False:
+                    # No change streams: poll the indexed delta queries instead
+                    time.sleep(POLL_INTERVAL)
+                    delta = fetch_delta(user, watermark)
+                    messages = list(delta_messages(dumps, delta))
+                    yield from messages or [": ping\n\n"]
+                    watermark = delta['watermark']
+                    continue
+
+                try:
+                    event = sub.events.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ": ping\n\n"
+                    continue
+                if sub.overflowed:
+                    sub.overflowed = False
+                    yield sse_message(dumps, 'resync', {})
+                yield sse_message(dumps, event['type'], event, feed_event_id(event))
+        finally:
+            job_feed.unsubscribe(sub)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    # Runs when the server closes the body, even if the client left before it started
+    response.call_on_close(_stream_slots.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
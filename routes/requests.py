@@ -1,11 +1,44 @@
 from flask import Blueprint, request, jsonify
 from lib.mongodb import get_database
 from lib.auth import get_user_from_token
+from lib.streaming import stream_json
+from lib.pagination import parse_timestamp, sync_watermark
+from lib.json_provider import encode_bson
 from bson import ObjectId
 from datetime import datetime
 
 requests_bp = Blueprint('requests', __name__)
 
+TOMBSTONE_PROJECTION = {'_id': 1, 'status': 1, 'updatedAt': 1}
+
+def updated_since_arg(args):
+    """Parsed ?updated_since= (ISO 8601 or epoch ms), or None for a full listing"""
+    value = args.get('updated_since')
+    return parse_timestamp(value) if value else None
+
+def pending_delta_queries(since: datetime):
+    """(changed, removed) filters for a pending-list delta (status_updated index).
+
+    changed matches pending rows updated after since; removed matches rows
+    that were updated into any other status, returned as tombstones.
+    """
+    changed = {'status': 'pending', 'updatedAt': {'$gt': since}}
+    removed = {'status': {'$ne': 'pending'}, 'updatedAt': {'$gt': since}}
+    return changed, removed
+
+def my_requests_delta_query(customer_id: str, since: datetime) -> dict:
+    """A customer's requests updated after since; they never leave the list"""
+    return {'customerId': customer_id, 'updatedAt': {'$gt': since}}
+
+def delta_tail(removed: list, watermark: datetime):
+    """stream_json tail for a delta response: tombstones and the next watermark"""
+    return lambda last, count: {'removed': removed, 'watermark': watermark}
+
+def watermark_header(response, watermark: datetime):
+    """Full listings carry the watermark too, so clients can switch to deltas"""
+    response.headers['X-Sync-Watermark'] = encode_bson(watermark)
+    return response
+
 def get_current_user():
     """Extract current user from request headers"""
     auth_header = request.headers.get('Authorization')
@@ -23,24 +56,15 @@ def get_current_user():
     # Extract token from "Bearer <token>" format
     try:
         token = auth_header.split(' ')[1] if ' ' in auth_header else auth_header
-        user_info = get_user_from_token(token)
-        if user_info:
-            # Get full user data from database
-            try:
-                db = get_database()
-                users_collection = db['users']
-                user = users_collection.find_one({'_id': ObjectId(user_info['id'])})
-                if user:
-                    return {
-                        'id': str(user['_id']),
-                        'username': user['username'],
-                        'fullName': user['fullName'],
-                        'email': user['email'],
-                        'role': user['role']
-                    }
-            except Exception as db_error:
-                print(f"Database error in get_current_user: {db_error}")
-                return None
+        user = get_user_from_token(token)
+        if user:
+            return {
+                'id': str(user['_id']),
+                'username': user['username'],
+                'fullName': user['fullName'],
+                'email': user['email'],
+                'role': user['role']
+            }
     except Exception as e:
         print(f"Error extracting user from token: {e}")
     
@@ -90,13 +114,18 @@ def create_request():
 
 @requests_bp.route('/my-requests', methods=['GET'])
 def get_my_requests():
-    """Get all requests for the current user"""
+    """Get all requests for the current user (?updated_since= as for /pending)"""
     try:
         user = get_current_user()
         
         if not user:
             return jsonify({'error': 'Unauthorized'}), 401
         
+        try:
+            since = updated_since_arg(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         try:
             db = get_database()
         except Exception as db_error:
@@ -106,20 +135,19 @@ def get_my_requests():
             }), 503
         
         requests_collection = db['service_requests']
+        watermark = sync_watermark()
         
-        requests = list(requests_collection.find(
-            {'customerId': user['id']}
-        ).sort('createdAt', -1))
+        if since is not None:
+            requests = requests_collection.find(
+                my_requests_delta_query(user['id'], since)
+            ).sort('updatedAt', 1)
+            return stream_json(requests, key='requests', tail=delta_tail([], watermark))
         
-        # Convert ObjectId to string for JSON serialization
-        for req in requests:
-            req['_id'] = str(req['_id'])
-            if 'createdAt' in req:
-                req['createdAt'] = req['createdAt'].isoformat() if hasattr(req['createdAt'], 'isoformat') else str(req['createdAt'])
-            if 'updatedAt' in req:
-                req['updatedAt'] = req['updatedAt'].isoformat() if hasattr(req['updatedAt'], 'isoformat') else str(req['updatedAt'])
+        requests = requests_collection.find(
+            {'customerId': user['id']}
+        ).sort('createdAt', -1)
         
-        return jsonify(requests), 200
+        return watermark_header(stream_json(requests), watermark)
         
     except Exception as error:
         print(f"Fetch requests error: {error}")
@@ -127,8 +155,19 @@ def get_my_requests():
 
 @requests_bp.route('/pending', methods=['GET'])
 def get_pending_requests():
-    """Get all pending service requests"""
+    """Get all pending service requests.
+
+    With ?updated_since= only the changes since then are returned:
+    {"requests": [...], "removed": [tombstones], "watermark": ...}; send the
+    watermark as the next updated_since. Full listings return it in the
+    X-Sync-Watermark header.
+    """
     try:
+        try:
+            since = updated_since_arg(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         try:
             db = get_database()
         except Exception as db_error:
@@ -138,20 +177,19 @@ def get_pending_requests():
             }), 503
         
         requests_collection = db['service_requests']
+        watermark = sync_watermark()
         
-        requests = list(requests_collection.find(
-            {'status': 'pending'}
-        ).sort('createdAt', -1))
+        if since is not None:
+            changed, removed = pending_delta_queries(since)
+            tombstones = list(requests_collection.find(removed, TOMBSTONE_PROJECTION))
+            requests = requests_collection.find(changed).sort('updatedAt', 1)
+            return stream_json(requests, key='requests', tail=delta_tail(tombstones, watermark))
         
-        # Convert ObjectId to string for JSON serialization
-        for req in requests:
-            req['_id'] = str(req['_id'])
-            if 'createdAt' in req:
-                req['createdAt'] = req['createdAt'].isoformat() if hasattr(req['createdAt'], 'isoformat') else str(req['createdAt'])
-            if 'updatedAt' in req:
-                req['updatedAt'] = req['updatedAt'].isoformat() if hasattr(req['updatedAt'], 'isoformat') else str(req['updatedAt'])
+        requests = requests_collection.find(
+            {'status': 'pending'}
+        ).sort('createdAt', -1)
         
-        return jsonify(requests), 200
+        return watermark_header(stream_json(requests), watermark)
         
     except Exception as error:
         print(f"Fetch pending requests error: {error}")
@@ -1,71 +1,264 @@
 # routes/services.py
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from lib.mongodb import get_database
 from lib.decorators import token_required
-from datetime import datetime
+from lib.auth import invalidate_user
+from lib.pagination import parse_limit, encode_cursor, decode_cursor, keyset_filter, parse_timestamp
+from lib.availability import load_schedules, parse_duration, release, reserve, MAX_WINDOW_DAYS
+from lib.catalogue import service_catalogue, CATALOGUE_MAX_AGE
+from datetime import datetime, timedelta
 from bson.objectid import ObjectId
+from bson.errors import InvalidId
 
 services_bp = Blueprint('services', __name__)
 
 @services_bp.route('/services', methods=['GET'])
 def get_services():
     """Get all available service categories"""
-    db = get_database()
-    services = list(db.services.find({}, {'_id': 0}))
-    if not services:
-        # Initialize default services if empty
-        default_services = [
-            {"name": "Domestic Cleaning", "category": "cleaning", "description": "Home cleaning services"},
-            {"name": "Plumbing", "category": "plumbing", "description": "Pipe and fixture repairs"},
-            {"name": "Electrical Work", "category": "electrical", "description": "Wiring and electrical installations"},
-            {"name": "Pest Control", "category": "pest_control", "description": "Insect and rodent removal"},
-            {"name": "Appliance Installation", "category": "appliance", "description": "Installation of household appliances"},
-            {"name": "General Maintenance", "category": "maintenance", "description": "General home repair services"}
-        ]
-        db.services.insert_many(default_services)
-        services = default_services
-    return jsonify(services), 200
+    body, etag = service_catalogue.get()
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = CATALOGUE_MAX_AGE
+    # Turns into an empty 304 when If-None-Match matches
+    return response.make_conditional(request)
 
-@services_bp.route('/providers', methods=['GET'])
-def get_providers():
-    """Get available providers with filtering"""
-    db = get_database()
-    service_type = request.args.get('service')
-    location = request.args.get('location')
+PROVIDER_SORTS = ('distance', 'rate', 'rating')
+PROVIDER_PROJECTION = {'password': 0, 'is_verified': 0}
+MAX_RADIUS_KM = 500
+
+def _float_arg(args, name):
+    value = args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
+def provider_search_pipeline(args):
+    """Build the /api/providers aggregation from query args.
+
+    Returns (pipeline, sort_field, limit); raises ValueError for bad input.
+    Shared by the sync route and the async API.
+    """
+    service_type = args.get('service')
+    location = args.get('location')
+    lat, lng = _float_arg(args, 'lat'), _float_arg(args, 'lng')
+    radius_km = _float_arg(args, 'radius_km')
+    min_rate, max_rate = _float_arg(args, 'min_rate'), _float_arg(args, 'max_rate')
+    min_rating = _float_arg(args, 'min_rating')
+    limit = parse_limit(args.get('limit'))
+    cursor = args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+
+    geo = lat is not None and lng is not None
+    sort = args.get('sort', 'distance' if geo else 'rating')
+    if sort not in PROVIDER_SORTS:
+        raise ValueError(f"sort must be one of: {', '.join(PROVIDER_SORTS)}")
+    if sort == 'distance' and not geo:
+        raise ValueError('sort=distance requires lat and lng')
+    if (lat is None) != (lng is None):
+        raise ValueError('lat and lng must be given together')
     
     query = {'role': 'provider', 'is_verified': True}
     if service_type:
-        query['services_offered'] = {'$in': [service_type]}
+        # Equality on the array field so the compound indexes can be used
+        query['services_offered'] = service_type
     if location:
         query['location'] = location
-    
-    providers = list(db.users.find(query, {
-        'password': 0,
-        'is_verified': 0
-    }))
-    return jsonify(providers), 200
+    if min_rate is not None or max_rate is not None:
+        query['hourly_rate'] = {}
+        if min_rate is not None:
+            query['hourly_rate']['$gte'] = min_rate
+        if max_rate is not None:
+            query['hourly_rate']['$lte'] = max_rate
+    if min_rating is not None:
+        query['rating_avg'] = {'$gte': min_rating}
+
+    if sort == 'distance':
+        sort_field, descending = 'distance_m', False
+    elif sort == 'rate':
+        sort_field, descending = 'hourly_rate', False
+    else:
+        sort_field, descending = 'rating_avg', True
+    direction = -1 if descending else 1
+
+    if geo:
+        geo_near = {
+            'near': {'type': 'Point', 'coordinates': [lng, lat]},
+            'distanceField': 'distance_m',
+            'spherical': True,
+            'query': query,
+            'maxDistance': min(radius_km or MAX_RADIUS_KM, MAX_RADIUS_KM) * 1000
+        }
+        if sort == 'distance' and after is not None:
+            geo_near['minDistance'] = after[0]
+        pipeline = [{'$geoNear': geo_near}]
+    else:
+        pipeline = [{'$match': query}]
+    if after is not None:
+        pipeline.append({'$match': keyset_filter(sort_field, after[0], after[1], descending)})
+    pipeline += [
+        {'$sort': {sort_field: direction, '_id': direction}},
+        {'$limit': limit},
+        {'$project': PROVIDER_PROJECTION}
+    ]
+    return pipeline, sort_field, limit
+
+def next_page_cursor(rows, sort_field, limit):
+    """Cursor for the page after rows, or None if this was the last page"""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(last.get(sort_field), last['_id'])
+
+@services_bp.route('/providers', methods=['GET'])
+def get_providers():
+    """Search verified providers.
+
+    Query params: service, location (exact area name), lat/lng/radius_km
+    (geo radius search), min_rate/max_rate (hourly_rate), min_rating,
+    sort (distance | rate | rating), limit, cursor.
+    """
+    try:
+        pipeline, sort_field, limit = provider_search_pipeline(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_database()
+    providers = list(db.users.aggregate(pipeline))
+    return jsonify({
+        'providers': providers,
+        'next_cursor': next_page_cursor(providers, sort_field, limit)
+    }), 200
+
+def _duration_arg(args) -> int:
+    value = args.get('duration_minutes')
+    if value is not None and not value.isdigit():
+        raise ValueError('duration_minutes must be a whole number')
+    return parse_duration(int(value) if value is not None else None)
+
+def _time_range(args, default_days: int = None):
+    """(start, end) from ?start=&end= (or &duration_minutes=); raises ValueError"""
+    if args.get('start'):
+        start = parse_timestamp(args['start'])
+    elif default_days:
+        start = datetime.utcnow().replace(second=0, microsecond=0)
+    else:
+        raise ValueError('start is required')
+    if args.get('end'):
+        end = parse_timestamp(args['end'])
+    elif default_days:
+        end = start + timedelta(days=default_days)
+    else:
+        end = start + timedelta(minutes=_duration_arg(args))
+    if end <= start:
+        raise ValueError('end must be after start')
+    if end - start > timedelta(days=MAX_WINDOW_DAYS):
+        raise ValueError(f"Range can span at most {MAX_WINDOW_DAYS} days")
+    return start, end
+
+@services_bp.route('/providers/<provider_id>/availability', methods=['GET'])
+def provider_availability(provider_id):
+    """Is the provider free for [start, end)?
+
+    Query params: start, and end or duration_minutes (ISO 8601 or epoch ms).
+    """
+    try:
+        provider_id = ObjectId(provider_id)
+        start, end = _time_range(request.args)
+    except InvalidId:
+        return jsonify({'error': 'Invalid provider id'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    schedule = load_schedules([provider_id])[provider_id]
+    conflicts = schedule.conflicts(start, end)
+    return jsonify({
+        'provider_id': provider_id,
+        'start': start,
+        'end': end,
+        'available': not conflicts,
+        'busy': [{'start': c['start'], 'end': c['end']} for c in conflicts]
+    }), 200
+
+@services_bp.route('/availability', methods=['GET'])
+def search_availability():
+    """Free time of matching providers, e.g. ?service=plumbing for the next week.
+
+    Takes every /api/providers filter plus start/end (default: now and 7
+    days on) and duration_minutes (shortest window worth listing). Each
+    provider comes with its free windows inside working hours.
+    """
+    try:
+        pipeline, sort_field, limit = provider_search_pipeline(request.args)
+        start, end = _time_range(request.args, default_days=7)
+        minutes = _duration_arg(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    db = get_database()
+    providers = list(db.users.aggregate(pipeline))
+    schedules = load_schedules([p['_id'] for p in providers], db)
+    for provider in providers:
+        provider['free'] = schedules[provider['_id']].free_windows(start, end, minutes)
+    return jsonify({
+        'start': start,
+        'end': end,
+        'duration_minutes': minutes,
+        'providers': providers,
+        'next_cursor': next_page_cursor(providers, sort_field, limit)
+    }), 200
 
 @services_bp.route('/book', methods=['POST'])
 def book_service():
-    """Customer books a service"""
+    """Customer books a service.
+
+    duration_minutes is optional (default DEFAULT_BOOKING_MINUTES); the
+    provider's time is reserved first, so overlapping requests get a 409.
+    """
     data = request.get_json()
-    if not data or not all(k in data for k in ('provider_id', 'service_type', 'booking_time', 'price')):
+    required = ('customer_id', 'provider_id', 'service_type', 'booking_time', 'price')
+    if not data or not all(k in data for k in required):
         return jsonify({'error': 'Missing required fields'}), 400
-    
-    db = get_database()
+    try:
+        provider_id = ObjectId(data['provider_id'])
+        booking_time = parse_timestamp(str(data['booking_time']))
+        duration = parse_duration(data.get('duration_minutes'))
+    except InvalidId:
+        return jsonify({'error': 'Invalid provider id'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    end_time = booking_time + timedelta(minutes=duration)
+
+    now = datetime.utcnow()
+    booking_id = ObjectId()
+    # Built before reserving: once the slot is held, only the insert can fail
     booking = {
+        '_id': booking_id,
         'customer_id': data['customer_id'],
-        'provider_id': ObjectId(data['provider_id']),
+        'provider_id': provider_id,
         'service_type': data['service_type'],
-        'booking_time': datetime.fromisoformat(data['booking_time']),
+        'booking_time': booking_time,
+        'duration_minutes': duration,
+        'end_time': end_time,
         'status': 'pending',
         'price': data['price'],
-        'created_at': datetime.utcnow()
+        'created_at': now,
+        'updated_at': now
     }
-    
-    result = db.bookings.insert_one(booking)
-    return jsonify({'booking_id': str(result.inserted_id)}), 201
+
+    db = get_database()
+    if not reserve(provider_id, booking_time, end_time, booking_id, db):
+        return jsonify({'error': 'Provider is already booked at that time'}), 409
+    try:
+        db.bookings.insert_one(booking)
+    except Exception:
+        release(provider_id, booking_id, db)
+        raise
+    return jsonify({'booking_id': str(booking_id)}), 201
 
 @services_bp.route('/update-profile', methods=['POST'])
 @token_required
@@ -83,11 +276,18 @@ def update_provider_profile():
         'location': data.get('location', ''),
         'description': data.get('description', '')
     }
+    if data.get('lat') is not None and data.get('lng') is not None:
+        # GeoJSON point for radius search on /api/providers
+        update_data['geo'] = {
+            'type': 'Point',
+            'coordinates': [float(data['lng']), float(data['lat'])]
+        }
     
     result = db.users.update_one(
         {'_id': ObjectId(request.current_user['user_id'])},
         {'$set': update_data}
     )
+    invalidate_user(request.current_user['user_id'])
     
     if result.modified_count > 0:
         return jsonify({'message': 'Profile updated successfully'}), 200
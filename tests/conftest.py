@@ -0,0 +1,47 @@
+# tests/conftest.py
+
+import os
+import sys
+import time
+import uuid
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class FakeClock:
+    """Stands in for time.monotonic; advance() moves it forward"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(time, 'monotonic', fake)
+    return fake
+
+@pytest.fixture
+def db():
+    """A throwaway database on TEST_MONGODB_URI; tests using it skip without one"""
+    from pymongo import MongoClient
+    from pymongo.errors import PyMongoError
+
+    uri = os.getenv('TEST_MONGODB_URI')
+    if not uri:
+        pytest.skip('TEST_MONGODB_URI not set')
+    client = MongoClient(uri, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command('ping')
+    except PyMongoError as e:
+        client.close()
+        pytest.skip(f"MongoDB unreachable: {e}")
+    name = f"ayudabesh_test_{uuid.uuid4().hex[:8]}"
+    yield client[name]
+    client.drop_database(name)
+    client.close()
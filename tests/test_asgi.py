@@ -0,0 +1,47 @@
+# tests/test_asgi.py
+
+import asyncio
+import time
+from flask import Flask
+from quart import Quart
+from asgi import Dispatcher
+
+def slow_flask_app():
+    app = Flask(__name__)
+
+    @app.route('/slow')
+    def slow():
+        time.sleep(0.5)
+        return 'done'
+
+    return app
+
+async def call(asgi_app, path: str) -> int:
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'root_path': '', 'headers': [(b'host', b'testserver')],
+             'client': ('127.0.0.1', 5000), 'server': ('testserver', 80)}
+    status = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await asgi_app(scope, receive, send)
+    return status[0]
+
+def test_flask_routes_run_concurrently():
+    dispatcher = Dispatcher(Quart(__name__), slow_flask_app())
+
+    async def run():
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(call(dispatcher, '/slow') for _ in range(4)))
+        return statuses, time.perf_counter() - start
+
+    statuses, elapsed = asyncio.run(run())
+    assert statuses == [200] * 4
+    # One shared thread would take 2 s
+    assert elapsed < 1.5
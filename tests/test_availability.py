@@ -0,0 +1,62 @@
+# tests/test_availability.py
+
+import threading
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from lib.availability import backfill_schedules, load_schedules, reserve
+
+START = datetime(2030, 1, 7, 9, 0)
+
+def race(db, provider_id, slots) -> list:
+    """reserve() every (start, end) at once from its own thread; results in order"""
+    barrier = threading.Barrier(len(slots))
+    results = [None] * len(slots)
+
+    def claim(i, start, end):
+        barrier.wait()
+        results[i] = reserve(provider_id, start, end, ObjectId(), db)
+
+    threads = [threading.Thread(target=claim, args=(i, start, end)) for i, (start, end) in enumerate(slots)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_overlapping_reserves_cannot_both_succeed(db):
+    # Fresh providers race on creating the schedule, the last rounds on updating it
+    for round_ in range(20):
+        provider_id = ObjectId()
+        if round_ >= 10:
+            earlier = START - timedelta(days=1)
+            assert reserve(provider_id, earlier, earlier + timedelta(minutes=30), ObjectId(), db)
+        results = race(db, provider_id, [(START, START + timedelta(hours=1)),
+                                         (START + timedelta(minutes=30), START + timedelta(hours=2))])
+        assert sorted(results) == [False, True]
+        schedule = load_schedules([provider_id], db)[provider_id]
+        assert len(schedule.conflicts(START, START + timedelta(hours=2))) == 1
+
+def test_adjacent_reserves_both_succeed(db):
+    provider_id = ObjectId()
+    results = race(db, provider_id, [(START, START + timedelta(hours=1)),
+                                     (START + timedelta(hours=1), START + timedelta(hours=2))])
+    assert results == [True, True]
+
+def test_backfill_adds_missing_bookings_once(db):
+    provider_id = ObjectId()
+    reserved, missing = ObjectId(), ObjectId()
+    assert reserve(provider_id, START, START + timedelta(hours=1), reserved, db)
+    db.bookings.insert_many([
+        {'_id': reserved, 'provider_id': provider_id, 'status': 'accepted',
+         'booking_time': START, 'end_time': START + timedelta(hours=1)},
+        {'_id': missing, 'provider_id': provider_id, 'status': 'pending',
+         'booking_time': START + timedelta(hours=3), 'end_time': START + timedelta(hours=4)},
+        {'provider_id': provider_id, 'status': 'declined',
+         'booking_time': START + timedelta(hours=5), 'end_time': START + timedelta(hours=6)},
+    ])
+
+    assert backfill_schedules(db) == 1
+    assert backfill_schedules(db) == 0
+    schedule = load_schedules([provider_id], db)[provider_id]
+    assert [i['booking_id'] for i in schedule.intervals] == [reserved, missing]
+    assert not reserve(provider_id, START + timedelta(hours=3), START + timedelta(hours=4), ObjectId(), db)
@@ -0,0 +1,65 @@
+# tests/test_book_service.py
+
+import pytest
+from bson.objectid import ObjectId
+from flask import Flask
+from pymongo.errors import AutoReconnect
+from routes import services
+
+BOOKING = {
+    'customer_id': str(ObjectId()),
+    'provider_id': str(ObjectId()),
+    'service_type': 'plumbing',
+    'booking_time': '2030-01-07T09:00:00',
+    'price': 500
+}
+
+class Bookings:
+    def __init__(self, error=None):
+        self.error = error
+        self.inserted = []
+
+    def insert_one(self, doc):
+        if self.error:
+            raise self.error
+        self.inserted.append(doc)
+
+class Database:
+    def __init__(self, bookings):
+        self.bookings = bookings
+
+@pytest.fixture
+def schedule(monkeypatch):
+    """Records reserve()/release() calls instead of touching provider_schedules"""
+    calls = {'reserved': [], 'released': []}
+    monkeypatch.setattr(services, 'reserve',
+                        lambda provider_id, start, end, booking_id, db: calls['reserved'].append(booking_id) or True)
+    monkeypatch.setattr(services, 'release',
+                        lambda provider_id, booking_id, db: calls['released'].append(booking_id))
+    return calls
+
+def post(monkeypatch, body, bookings=None):
+    monkeypatch.setattr(services, 'get_database', lambda: Database(bookings or Bookings()))
+    app = Flask(__name__)
+    app.register_blueprint(services.services_bp, url_prefix='/api')
+    return app.test_client().post('/api/book', json=body)
+
+@pytest.mark.parametrize('field', ['customer_id', 'provider_id', 'service_type', 'booking_time', 'price'])
+def test_missing_field_is_rejected_before_reserving(monkeypatch, schedule, field):
+    body = {k: v for k, v in BOOKING.items() if k != field}
+    response = post(monkeypatch, body)
+    assert response.status_code == 400
+    assert schedule['reserved'] == []
+
+def test_booking_reserves_then_inserts(monkeypatch, schedule):
+    bookings = Bookings()
+    response = post(monkeypatch, BOOKING, bookings)
+    assert response.status_code == 201
+    assert [doc['_id'] for doc in bookings.inserted] == schedule['reserved']
+    assert schedule['released'] == []
+
+def test_failed_insert_gives_the_slot_back(monkeypatch, schedule):
+    response = post(monkeypatch, BOOKING, Bookings(error=AutoReconnect('connection lost')))
+    assert response.status_code == 500
+    assert schedule['released'] == schedule['reserved']
+    assert len(schedule['released']) == 1
@@ -0,0 +1,28 @@
+# tests/test_compression.py
+
+import gzip
+import pytest
+from flask import Flask
+from lib.compression import init_compression
+
+CSS = ('.card { padding: 16px; margin: 0 auto; }\n' * 200).encode('utf-8')
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / 'site.css').write_bytes(CSS)
+    app = Flask(__name__, static_folder=str(tmp_path))
+    init_compression(app)
+    return app.test_client()
+
+def test_full_static_response_is_compressed(client):
+    response = client.get('/static/site.css', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == CSS
+
+def test_range_response_is_not_compressed(client):
+    response = client.get('/static/site.css', headers={'Accept-Encoding': 'gzip', 'Range': 'bytes=100-1099'})
+    assert response.status_code == 206
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Content-Range'] == f"bytes 100-1099/{len(CSS)}"
+    assert response.data == CSS[100:1100]
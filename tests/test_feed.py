@@ -0,0 +1,39 @@
+# tests/test_feed.py
+
+import threading
+import pytest
+from bson.objectid import ObjectId
+from flask import Flask
+from lib.auth import generate_token
+from lib.job_feed import job_feed
+from routes import feed
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(feed, '_stream_slots', threading.BoundedSemaphore(1))
+    monkeypatch.setattr(job_feed, 'available', None)
+    app = Flask(__name__)
+    app.register_blueprint(feed.feed_bp, url_prefix='/api/feed')
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f"Bearer {generate_token(str(ObjectId()), 'provider')}"
+    return client
+
+def test_streams_past_the_cap_are_refused(client):
+    first = client.get('/api/feed/jobs/stream', buffered=False)
+    assert first.status_code == 200
+
+    refused = client.get('/api/feed/jobs/stream', buffered=False)
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After'] == str(feed.STREAM_RETRY_AFTER)
+
+    # Closing a stream, even one never read from, frees its slot
+    first.close()
+    again = client.get('/api/feed/jobs/stream', buffered=False)
+    assert again.status_code == 200
+    again.close()
+
+def test_streams_refused_without_change_streams(client, monkeypatch):
+    monkeypatch.setattr(job_feed, 'available', False)
+    response = client.get('/api/feed/jobs/stream', buffered=False)
+    assert response.status_code == 503
+    assert 'Retry-After' in response.headers
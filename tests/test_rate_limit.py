@@ -0,0 +1,82 @@
+# tests/test_rate_limit.py
+
+import pytest
+from flask import Flask
+from pymongo.errors import ServerSelectionTimeoutError
+from lib import rate_limit
+from lib.rate_limit import LOGIN_USER_BURST, LOGIN_USER_PER_MINUTE, LoginLimiter, MemoryStore
+
+class BrokenStore:
+    """A store whose backend is down"""
+
+    def take(self, key, capacity, rate):
+        raise ServerSelectionTimeoutError('no servers')
+
+    def reset(self, key):
+        raise ServerSelectionTimeoutError('no servers')
+
+def drain(limiter: LoginLimiter, username: str = 'alice'):
+    for _ in range(LOGIN_USER_BURST):
+        assert limiter.check('10.0.0.1', username) is None
+
+def test_bucket_rejects_once_empty(clock):
+    store = MemoryStore()
+    for _ in range(3):
+        assert store.take('k', 3, 1 / 60) == (True, 0)
+    allowed, retry_after = store.take('k', 3, 1 / 60)
+    assert not allowed
+    assert retry_after == pytest.approx(60)
+
+def test_bucket_refills_over_time(clock):
+    store = MemoryStore()
+    store.take('k', 1, 1 / 60)
+    clock.advance(30)
+    allowed, retry_after = store.take('k', 1, 1 / 60)
+    assert not allowed
+    assert retry_after == pytest.approx(30)
+    clock.advance(30)
+    assert store.take('k', 1, 1 / 60)[0]
+
+def test_buckets_are_per_key(clock):
+    store = MemoryStore()
+    store.take('a', 1, 1 / 60)
+    assert not store.take('a', 1, 1 / 60)[0]
+    assert store.take('b', 1, 1 / 60)[0]
+
+def test_limiter_rejects_username_after_burst(clock):
+    limiter = LoginLimiter(MemoryStore())
+    drain(limiter)
+    assert limiter.check('10.0.0.1', 'alice') == round(60 / LOGIN_USER_PER_MINUTE)
+    # Username buckets ignore case, and other users are unaffected
+    assert limiter.check('10.0.0.1', 'ALICE') is not None
+    assert limiter.check('10.0.0.1', 'bob') is None
+    assert limiter.stats()['rejected_username'] == 2
+
+def test_successful_login_resets_username_bucket(clock):
+    limiter = LoginLimiter(MemoryStore())
+    drain(limiter)
+    limiter.succeeded('Alice')
+    assert limiter.check('10.0.0.1', 'alice') is None
+
+def test_store_errors_fail_open(clock):
+    limiter = LoginLimiter(BrokenStore())
+    for _ in range(LOGIN_USER_BURST + 1):
+        assert limiter.check('10.0.0.1', 'alice') is None
+    limiter.succeeded('alice')
+    assert limiter.stats()['store_errors'] == 2 * (LOGIN_USER_BURST + 1)
+
+def test_login_route_answers_429_with_retry_after(clock, monkeypatch):
+    from routes import auth
+
+    limiter = LoginLimiter(MemoryStore())
+    monkeypatch.setattr(auth, 'login_limiter', limiter)
+    monkeypatch.setattr(rate_limit, 'RATE_LIMIT_TRUST_FORWARDED', False)
+    app = Flask(__name__)
+    app.register_blueprint(auth.auth_bp, url_prefix='/api/auth')
+    drain(limiter)
+
+    response = app.test_client().post(
+        '/api/auth/login', json={'username': 'alice', 'password': 'wrong', 'role': 'customer'},
+        environ_base={'REMOTE_ADDR': '10.0.0.1'})
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == str(round(60 / LOGIN_USER_PER_MINUTE))
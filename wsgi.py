@@ -0,0 +1,11 @@
+# wsgi.py
+"""Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+Index creation and seeding are left to the gunicorn master (see
+gunicorn.conf.py:when_ready), so importing this module opens no
+connections.
+"""
+
+from app import create_app
+
+app = create_app(bootstrap=False)